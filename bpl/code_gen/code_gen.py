@@ -89,11 +89,10 @@ class CodeGenerator():
 
         """
         param_offset = 2 * self.WORD_SIZE # parameters begin at 16(fp)
-        if func.params is not None:
-            for param in func.params:
-                param.offset = param_offset
-                self.print_debug('param {0} assigned offset {1}'.format(param.name, param.offset))
-                param_offset += self.WORD_SIZE
+        for param in func.params:
+            param.offset = param_offset
+            self.print_debug('param {0} assigned offset {1}'.format(param.name, param.offset))
+            param_offset += self.WORD_SIZE
         # assign offsets to local variables; first is at -self.WORD_SIZE
         local_offset = -self.WORD_SIZE
         # locals_size is the number of bytes to allocate for local
@@ -111,21 +110,19 @@ class CodeGenerator():
 
         """
         if stmt.kind == TN.COMP_STMT:
-            if stmt.local_decs is not None:
-                for local_dec in stmt.local_decs:
-                    if local_dec.kind == TN.ARR_DEC:
-                        dec_offset -= self.WORD_SIZE * (local_dec.size - 1)
-                        local_dec.offset = dec_offset
-                        self.print_debug('local var {0} assigned offset {1}'.format(local_dec.name, local_dec.offset))
-                        dec_offset -= self.WORD_SIZE
-                    else:
-                        local_dec.offset = dec_offset
-                        self.print_debug('local var {0} assigned offset {1}'.format(local_dec.name, local_dec.offset))
-                        dec_offset -= self.WORD_SIZE
+            for local_dec in stmt.local_decs:
+                if local_dec.kind == TN.ARR_DEC:
+                    dec_offset -= self.WORD_SIZE * (local_dec.size - 1)
+                    local_dec.offset = dec_offset
+                    self.print_debug('local var {0} assigned offset {1}'.format(local_dec.name, local_dec.offset))
+                    dec_offset -= self.WORD_SIZE
+                else:
+                    local_dec.offset = dec_offset
+                    self.print_debug('local var {0} assigned offset {1}'.format(local_dec.name, local_dec.offset))
+                    dec_offset -= self.WORD_SIZE
             # assign offsets to locals in nested compound statements
-            if stmt.stmt_list is not None:
-                for body_stmt in stmt.stmt_list:
-                    dec_offset = self.assign_offsets_stmt(body_stmt, dec_offset)
+            for body_stmt in stmt.stmt_list:
+                dec_offset = self.assign_offsets_stmt(body_stmt, dec_offset)
         elif stmt.kind == TN.IF_STMT:
             dec_offset = self.assign_offsets_stmt(stmt.true_body, dec_offset)
             if stmt.false_body is not None:
@@ -145,8 +142,7 @@ class CodeGenerator():
         elif node.kind == TN.FUN_DEC:
             self.build_string_dict(node.body)
         elif node.kind == TN.COMP_STMT:
-            if node.stmt_list is not None:
-                map(self.build_string_dict, node.stmt_list)
+            map(self.build_string_dict, node.stmt_list)
         elif node.kind == TN.EXPR_STMT:
             self.build_string_dict(node.expr)
         elif node.kind == TN.IF_STMT:
@@ -164,8 +160,7 @@ class CodeGenerator():
         elif node.kind == TN.ASSIGN_EXP:
             self.build_string_dict(node.r_exp)
         elif node.kind == TN.FUN_CALL_EXP:
-            if node.params is not None:
-                map(self.build_string_dict, node.params)
+            map(self.build_string_dict, node.params)
         elif node.kind in (TN.ADDR_EXP, TN.DEREF_EXP):
             self.build_string_dict(node.exp)
 
@@ -220,9 +215,8 @@ class CodeGenerator():
 
         """
         if stmt.kind == TN.COMP_STMT:
-            if stmt.stmt_list is not None:
-                for body_stmt in stmt.stmt_list:
-                    self.gen_stmt(body_stmt, func)
+            for body_stmt in stmt.stmt_list:
+                self.gen_stmt(body_stmt, func)
         elif stmt.kind in (TN.WRITE_STMT, TN.WRITELN_STMT):
             self.gen_write_stmt(stmt, func)
         elif stmt.kind == TN.IF_STMT:
@@ -331,10 +325,7 @@ class CodeGenerator():
     def gen_funcall_expr(self, expr):
         """Generate code for a function call expression :expr:."""
         # push args on stack in reverse order
-        if expr.params is not None:
-            args = [arg for arg in expr.params]
-        else:
-            args = []
+        args = expr.params
         for arg in reversed(args):
             self.gen_expr(arg)
             self.write_instr('push', self.acc, comment='push arg')
@@ -1,53 +1,107 @@
 from bpl.parser.parsetree import *
 from bpl.scanner.scanner import Scanner
-from bpl.scanner.token import TokenType
+from bpl.scanner.token import TokenType, TYPE_NAMES
+
+# Error message shared by the while and if statement productions.
+_ERR_COND_PAREN = 'conditional must be parenthesized'
+
+# Token type groups tested on every pass through the expression and
+# declaration productions.
+_DATA_TYPES = frozenset(TokenType.DataTypes)
+_RELOPS = frozenset(TokenType.Relops)
+_ADDOPS = frozenset((TokenType.PLUS, TokenType.MINUS))
+_MULOPS = frozenset((TokenType.STAR, TokenType.SLASH, TokenType.MOD))
 
 
 class Parser():
     def __init__(self, filename, tree=None):
-        """Initialize a parser to parse the contents of :filename:."""
+        """Initialize a parser to parse the contents of :filename:.
+
+        Throughout the parser, the 'current' token is the one being
+        examined, i.e. :self.scan.next_token:.
+
+        """
         self.filename = filename
         self.scan = Scanner(filename)
         self.tree = tree
+        # Productions dispatched on the current token's type.  Built
+        # once here so each dispatch is a single dict lookup.
+        self.statement_table = {
+            TokenType.LCURLY: self.compound_statement,
+            TokenType.WHILE: self.while_statement,
+            TokenType.IF: self.if_statement,
+            TokenType.RETURN: self.return_statement,
+            TokenType.WRITE: self.write_statement,
+            TokenType.WRITELN: self.writeln_statement
+        }
+        self.F_table = {
+            TokenType.MINUS: self.neg_F,
+            TokenType.AMP: self.addr_F,
+            TokenType.STAR: self.deref_F
+        }
+        self.factor_table = {
+            TokenType.ID: self.id_factor,
+            TokenType.READ: self.read_factor,
+            TokenType.STAR: self.deref_factor,
+            TokenType.NUM: self.num_factor,
+            TokenType.STRLIT: self.str_factor,
+            TokenType.LPAREN: self.paren_factor
+        }
+        # Keyed on the token following an ID factor.
+        self.id_factor_table = {
+            TokenType.LSQUARE: self.arr_factor,
+            TokenType.LPAREN: self.funcall_factor
+        }
+        # writeln and read nodes shared per line within this parse; see
+        # WritelnStmtNode.get and ReadExpNode.get.
+        self.writeln_nodes = {}
+        self.read_nodes = {}
+
+    def expect(self, token_type, message):
+        """Verify that the current token's type is :token_type:.  If it is,
+        advance the scanner and return the matched token.  Otherwise
+        throw a ParseException with message :message:.
 
-    def expect(self, *args):
-        """Verify that the current token's type matches what is expected.
-        If the tokentypes match, advance the scanner.
-        Otherwise throw an error.
+        """
+        current_token = self.scan.next_token
+        if current_token.typ != token_type:
+            self.expect_error(current_token, [TYPE_NAMES[token_type]], message)
+        self.scan.get_next_token()
+        return current_token
 
-        :*args: The first n-1 args are any acceptable TokenTypes, and
-        the last is the message of the Exception we will throw if the
-        types do not match.
+    def expect_any(self, token_types, message):
+        """Like :expect:, but accept any TokenType in the frozenset
+        :token_types:.
 
         """
-        current_token = self.cur_token()
-        message = args[-1]
-        token_types = args[:-1]
+        current_token = self.scan.next_token
         if current_token.typ not in token_types:
-            raise ParseException('%s:%d: Expected %s, but got %s: \"%s\"\n%s' %
-                                 (self.scan.filename,
-                                  self.cur_token().line,
-                                  [TokenType.constants[token_type]
-                                   for token_type in token_types],
-                                  TokenType.constants[current_token.typ],
-                                  current_token.val,
-                                  message))
-        self.consume()
+            self.expect_error(
+                current_token,
+                sorted(TYPE_NAMES[token_type] for token_type in token_types),
+                message
+            )
+        self.scan.get_next_token()
         return current_token
 
-    def cur_token(self):
-        """Wrapper for :self.scan.next_token:.  I find the 'next' terminology
-        confusing.  For the sake of clarity in this parser, we'll call
-        the 'current' token the one being currently examined.
+    def expect_error(self, current_token, expected, message):
+        """Raise the ParseException for a failed :expect:/:expect_any:.
+        :expected: is a list of TokenType names, printed as a list.
 
         """
-        return self.scan.next_token
+        raise ParseException('%s:%d: Expected %s, but got %s: \"%s\"\n%s' %
+                             (self.scan.filename,
+                              current_token.line,
+                              expected,
+                              TYPE_NAMES[current_token.typ],
+                              current_token.val,
+                              message))
 
     def consume(self):
         """Gets the next token from :self.scan: and returns the consumed one.
 
         """
-        last_token = self.cur_token()
+        last_token = self.scan.next_token
         self.scan.get_next_token()
         return last_token
 
@@ -59,26 +113,27 @@ class Parser():
         self.tree = tree
 
     def dec_list(self):
-        """Parse a top-level declaration list"""
-        head = self.declaration()
-        cur = head
-        while self.cur_token().typ in TokenType.DataTypes:
-            cur.nxt = self.declaration()
-            cur = cur.nxt
-        return head
+        """Parse a top-level declaration list (returns a list of
+        declaration nodes).
+
+        """
+        decs = [self.declaration()]
+        while self.scan.next_token.typ in _DATA_TYPES:
+            decs.append(self.declaration())
+        return decs
 
     def dec_header(self):
         """Parses the type and name (e.g. `int x`) of declarations."""
-        type_token = self.expect(
-            TokenType.INT, TokenType.STRING, TokenType.VOID,
+        type_token = self.expect_any(
+            _DATA_TYPES,
             'unexpected type identifier'
         )
         line = type_token.line
-        typ = BPLType(TokenType.constants[type_token.typ])
+        typ = BPLType(TYPE_NAMES[type_token.typ])
         is_pointer = False
-        if self.cur_token().typ is TokenType.STAR:
+        if self.scan.next_token.typ == TokenType.STAR:
             is_pointer = True
-            typ.address()
+            typ = typ.addr_of
             self.consume()
         var = self.expect(
             TokenType.ID,
@@ -87,8 +142,8 @@ class Parser():
         return typ, var, is_pointer, line
 
     def local_decs(self):
-        """Parses a list of local variable declarations (returns a VarDecNode
-        who'se self.nxt field may be another statement).
+        """Parses a list of local variable declarations (returns a list of
+        declaration nodes).
 
         """
         def assert_local(dec):
@@ -102,20 +157,16 @@ class Parser():
                 )
             return dec
 
-        head = None
-        if self.cur_token().typ in TokenType.DataTypes:
-            head = assert_local(self.declaration())
-            cur = head
-            while self.cur_token().typ in TokenType.DataTypes:
-                cur.nxt = assert_local(self.declaration())
-                cur = cur.nxt
-        return head
+        decs = []
+        while self.scan.next_token.typ in _DATA_TYPES:
+            decs.append(assert_local(self.declaration()))
+        return decs
 
     def declaration(self):
         """Parses variable, array, and function declarations."""
         typ, name, is_pointer, line = self.dec_header()
         if not is_pointer:
-            if self.cur_token().typ is TokenType.LSQUARE:
+            if self.scan.next_token.typ == TokenType.LSQUARE:
                 # array declaration
                 self.consume()
                 size = int(self.expect(
@@ -137,7 +188,7 @@ class Parser():
                     typ=typ,
                     size=size
                 )
-            if self.cur_token().typ is TokenType.LPAREN:
+            if self.scan.next_token.typ == TokenType.LPAREN:
                 # function declaration
                 self.consume()
                 args = self.params()
@@ -168,28 +219,26 @@ class Parser():
 
     def params(self):
         """Parses function params."""
-        if self.cur_token().typ is TokenType.VOID:
+        if self.scan.next_token.typ == TokenType.VOID:
             self.consume()
-            return None
+            return []
         return self.param_list()
 
     def param_list(self):
-        """Parses a function's parameter list (returns a declaration node
-        who'se self.nxt field may be another declaration node).
+        """Parses a function's parameter list (returns a list of declaration
+        nodes).
 
         """
-        head = self.param()
-        cur = head
-        while self.cur_token().typ is TokenType.COMMA:
+        params = [self.param()]
+        while self.scan.next_token.typ == TokenType.COMMA:
             self.consume()
-            cur.nxt = self.param_list()
-            cur = cur.nxt
-        return head
+            params.append(self.param())
+        return params
 
     def param(self):
         """Parses a function parameter."""
         typ, name, is_pointer, line = self.dec_header()
-        if not is_pointer and self.cur_token().typ is TokenType.LSQUARE:
+        if not is_pointer and self.scan.next_token.typ == TokenType.LSQUARE:
             # array declaration
             self.consume()
             self.expect(
@@ -212,21 +261,14 @@ class Parser():
         )
 
     def statement(self):
-        """Parses a statement."""
-        if self.cur_token().typ is TokenType.LCURLY:
-            return self.compound_statement()
-        elif self.cur_token().typ is TokenType.WHILE:
-            return self.while_statement()
-        elif self.cur_token().typ is TokenType.IF:
-            return self.if_statement()
-        elif self.cur_token().typ is TokenType.RETURN:
-            return self.return_statement()
-        elif self.cur_token().typ is TokenType.WRITE:
-            return self.write_statement()
-        elif self.cur_token().typ is TokenType.WRITELN:
-            return self.writeln_statement()
-        else:
-            return self.expression_statement()
+        """Parses a statement.  Since we dispatch on the statement's first
+        token here, the keyword-led productions (while, if, return,
+        write, writeln) consume their keyword without re-checking it.
+
+        """
+        return self.statement_table.get(
+            self.scan.next_token.typ, self.expression_statement
+        )()
 
     def compound_statement(self):
         """Parses a compound statement."""
@@ -248,13 +290,10 @@ class Parser():
 
     def while_statement(self):
         """Parses a while statement."""
-        while_token = self.expect(
-            TokenType.WHILE,
-            'while statement must start with keyword \"while\"'
-        )
+        while_token = self.consume()  # matched by statement()
         self.expect(
             TokenType.LPAREN,
-            'conditional must be parenthesized'
+            _ERR_COND_PAREN
         )
         cond = self.expression()
         self.expect(
@@ -271,13 +310,10 @@ class Parser():
 
     def if_statement(self):
         """Parses an if statement."""
-        if_token = self.expect(
-            TokenType.IF,
-            'if statement must start with keyword \"if\"'
-        )
+        if_token = self.consume()  # matched by statement()
         self.expect(
             TokenType.LPAREN,
-            'conditional must be parenthesized'
+            _ERR_COND_PAREN
         )
         cond = self.expression()
         self.expect(
@@ -286,7 +322,7 @@ class Parser():
         )
         true_body = self.statement()
         false_body = None
-        if self.cur_token().typ is TokenType.ELSE:
+        if self.scan.next_token.typ == TokenType.ELSE:
             self.consume()
             false_body = self.statement()
         return IfStmtNode(
@@ -299,11 +335,8 @@ class Parser():
 
     def return_statement(self):
         """Parses a return statement."""
-        ret_token = self.expect(
-            TokenType.RETURN,
-            'Return statement must begin with \"return\"'
-        )
-        if self.cur_token().typ is TokenType.SEMI:
+        ret_token = self.consume()  # matched by statement()
+        if self.scan.next_token.typ == TokenType.SEMI:
             self.consume()
             return RetStmtNode(
                 kind=ParseTreeNode.RET_STMT,
@@ -323,10 +356,7 @@ class Parser():
 
     def write_statement(self):
         """Parses a write statement."""
-        write_token = self.expect(
-            TokenType.WRITE,
-            'Write statement must begin with \"write\"'
-        )
+        write_token = self.consume()  # matched by statement()
         self.expect(
             TokenType.LPAREN,
             'Missing open paren after \"write\"'
@@ -348,10 +378,7 @@ class Parser():
 
     def writeln_statement(self):
         """Parses a writeln statement"""
-        write_token = self.expect(
-            TokenType.WRITELN,
-            'Writeln statement must begin with \"writeln\"'
-        )
+        write_token = self.consume()  # matched by statement()
         self.expect(
             TokenType.LPAREN,
             'Missing open paren after \"writeln\"'
@@ -364,24 +391,14 @@ class Parser():
             TokenType.SEMI,
             'Missing semicolon at end of writeln statement'
         )
-        return WritelnStmtNode(
-            kind=ParseTreeNode.WRITELN_STMT,
-            line_number=write_token.line
-        )
+        return WritelnStmtNode.get(self.writeln_nodes, write_token.line)
 
     def statement_list(self):
-        """Parses a statement list (returns a statement node who'se self.nxt
-        field may be another statement).
-
-        """
-        head = None
-        if self.cur_token().typ != TokenType.RCURLY:
-            head = self.statement()
-            cur = head
-            while self.cur_token().typ != TokenType.RCURLY:
-                cur.nxt = self.statement_list()
-                cur = cur.nxt
-        return head
+        """Parses a statement list (returns a list of statement nodes)."""
+        stmts = []
+        while self.scan.next_token.typ != TokenType.RCURLY:
+            stmts.append(self.statement())
+        return stmts
 
     def expression_statement(self):
         """Parses an expression statement."""
@@ -404,7 +421,8 @@ class Parser():
         # the expression as an E and then make sure we're not doing
         # something dumb like `5 = 6` before returning the expression.
         first_exp = self.E()
-        if self.cur_token().typ is TokenType.EQUAL:
+        typ = self.scan.next_token.typ
+        if typ == TokenType.EQUAL:
             # assignment expression
             if first_exp.kind not in (ParseTreeNode.VAR_EXP,
                                       ParseTreeNode.ARR_EXP,
@@ -418,24 +436,27 @@ class Parser():
                 )
             op = self.consume()
             next_exp = self.expression()
-            return OpExpNode(
-                kind=ParseTreeNode.ASSIGN_EXP,
-                line_number=first_exp.line_number,
-                op=op,
-                l_exp=first_exp,
-                r_exp=next_exp
-            )
-        elif self.cur_token().typ in TokenType.Relops:
-            # relational expression
-            op = self.consume()
-            next_exp = self.expression()
-            return OpExpNode(
-                kind=ParseTreeNode.COMP_EXP,
-                line_number=first_exp.line_number,
-                op=op,
-                l_exp=first_exp,
-                r_exp=next_exp
+            return OpExpNode.make(
+                ParseTreeNode.ASSIGN_EXP,
+                first_exp.line_number,
+                op,
+                first_exp,
+                next_exp
             )
+        elif typ in _RELOPS:
+            # relational expression.  Like E and T, fold chained
+            # operators to the left instead of recursing on the right.
+            exp = first_exp
+            while self.scan.next_token.typ in _RELOPS:
+                op = self.consume()
+                exp = OpExpNode.make(
+                    ParseTreeNode.COMP_EXP,
+                    first_exp.line_number,
+                    op,
+                    exp,
+                    self.E()
+                )
+            return exp
         # not an assignment or comparison statement.
         # just return the first E() we grabbed
         return first_exp
@@ -449,15 +470,15 @@ class Parser():
         # first E eventually goes to a T, so instead of first asking
         # for an E, we ask for a T.
         t = self.T()
-        while self.cur_token().typ in (TokenType.PLUS, TokenType.MINUS):
+        while self.scan.next_token.typ in _ADDOPS:
             # add/sub expression
             op = self.consume()
-            t1 = OpExpNode(
-                kind=ParseTreeNode.ARITH_EXP,
-                line_number=t.line_number,
-                op=op,
-                l_exp=t,
-                r_exp=self.T()
+            t1 = OpExpNode.make(
+                ParseTreeNode.ARITH_EXP,
+                t.line_number,
+                op,
+                t,
+                self.T()
             )
             t = t1
         return t
@@ -465,175 +486,189 @@ class Parser():
     def T(self):
         """Parses an expression produced by BPL's T non-terminal."""
         f = self.F()
-        while self.cur_token().typ in (TokenType.STAR,
-                                       TokenType.SLASH,
-                                       TokenType.MOD):
+        while self.scan.next_token.typ in _MULOPS:
             op = self.consume()
-            f1 = OpExpNode(
-                kind=ParseTreeNode.ARITH_EXP,
-                line_number=f.line_number,
-                op=op,
-                l_exp=f,
-                r_exp=self.F()
+            f1 = OpExpNode.make(
+                ParseTreeNode.ARITH_EXP,
+                f.line_number,
+                op,
+                f,
+                self.F()
             )
             f = f1
         return f
 
     def F(self):
         """Parses an expression produced by BPL's F non-terminal."""
-        line = self.cur_token().line
-        if self.cur_token().typ is TokenType.MINUS:
-            # negation expression
-            self.consume()
-            fact = self.factor()
-            return NegExpNode(
-                kind=ParseTreeNode.NEG_EXP,
-                line_number=line,
-                exp=fact
-            )
-        elif self.cur_token().typ is TokenType.AMP:
-            self.consume()
-            fact = self.factor()
-            return AddrExpNode(
-                kind=ParseTreeNode.ADDR_EXP,
-                line_number=line,
-                exp=fact
-            )
-        elif self.cur_token().typ is TokenType.STAR:
-            self.consume()
-            fact = self.factor()
-            return DerefExpNode(
-                kind=ParseTreeNode.DEREF_EXP,
-                line_number=line,
-                exp=fact
-            )
-        return self.factor()
+        return self.F_table.get(self.scan.next_token.typ, self.factor)()
+
+    def neg_F(self):
+        """Parses a negation expression."""
+        line = self.consume().line
+        return NegExpNode(
+            kind=ParseTreeNode.NEG_EXP,
+            line_number=line,
+            exp=self.factor()
+        )
+
+    def addr_F(self):
+        """Parses an address expression."""
+        line = self.consume().line
+        return AddrExpNode(
+            kind=ParseTreeNode.ADDR_EXP,
+            line_number=line,
+            exp=self.factor()
+        )
+
+    def deref_F(self):
+        """Parses a dereference expression."""
+        line = self.consume().line
+        return DerefExpNode(
+            kind=ParseTreeNode.DEREF_EXP,
+            line_number=line,
+            exp=self.factor()
+        )
 
     def factor(self):
         """Parses an expression produced by BPL's Factor non-terminal."""
-        if self.cur_token().typ is TokenType.ID:
-            name = self.consume()
-            line = name.line
-            if self.cur_token().typ is TokenType.LSQUARE:
-                # array expression
-                self.consume()
-                index = self.expression()
-                self.expect(
-                    TokenType.RSQUARE,
-                    'Missing closing square bracket for array reference'
-                )
-                return ArrExpNode(
-                    kind=ParseTreeNode.ARR_EXP,
-                    line_number=line,
-                    name=name.val,
-                    index=index
-                )
-            elif self.cur_token().typ is TokenType.LPAREN:
-                # function call expression
-                self.consume()
-                args = self.args()
-                self.expect(
-                    TokenType.RPAREN,
-                    'Missing closing paren at function call'
-                )
-                return FunCallExpNode(
-                    kind=ParseTreeNode.FUN_CALL_EXP,
-                    line_number=line,
-                    name=name.val,
-                    params=args
-                )
-            else:
-                # variable expression
-                return VarExpNode(
-                    kind=ParseTreeNode.VAR_EXP,
-                    line_number=line,
-                    name=name.val
+        production = self.factor_table.get(self.scan.next_token.typ)
+        if production is None:
+            # Not looking at a factor!
+            raise ParseException(
+                '%s:%d: Unexpected token parsing factor: %s' % (
+                    self.scan.filename,
+                    self.scan.next_token.line,
+                    self.scan.next_token
                 )
-        elif self.cur_token().typ is TokenType.READ:
-            # read expression
-            line = self.consume().line
-            self.expect(
-                TokenType.LPAREN,
-                'Missing opening paren at read expression'
-            )
-            self.expect(
-                TokenType.RPAREN,
-                'Missing closing paren at read expression'
-            )
-            return ReadExpNode(
-                kind=ParseTreeNode.READ_EXP,
-                line_number=line
-            )
-        elif self.cur_token().typ is TokenType.STAR:
-            # dereference expression
-            line = self.consume().line
-            return DerefExpNode(
-                kind=ParseTreeNode.DEREF_EXP,
-                line_number=line,
-                exp=self.var()
-            )
-        elif self.cur_token().typ is TokenType.NUM:
-            # number expression
-            num = self.consume()
-            return IntExpNode(
-                kind=ParseTreeNode.INT_EXP,
-                line_number=num.line,
-                val=int(num.val)
-            )
-        elif self.cur_token().typ is TokenType.STRLIT:
-            # string expression
-            string = self.consume()
-            return StrExpNode(
-                kind=ParseTreeNode.STR_EXP,
-                line_number=string.line,
-                val=string.val
-            )
-        elif self.cur_token().typ is TokenType.LPAREN:
-            self.consume()
-            exp = self.expression()
-            self.expect(
-                TokenType.RPAREN,
-                'Parenthesized expression must end in right paren'
-            )
-            return exp
-        # Not looking at a factor!
-        raise ParseException(
-            '%s:%d: Unexpected token parsing factor: %s' % (
-                self.scan.filename,
-                self.cur_token().line,
-                self.cur_token()
             )
+        return production()
+
+    def id_factor(self):
+        """Parses a variable, array, or function call expression, chosen by
+        peeking at the token after the ID.
+
+        """
+        return self.id_factor_table.get(
+            self.scan.peek_next().typ,
+            self.var
+        )()
+
+    def arr_factor(self):
+        """Parses an array expression.  The ID and opening square bracket
+        have already been matched by :id_factor:.
+
+        """
+        name = self.consume()
+        self.consume()  # matched by id_factor()
+        index = self.expression()
+        self.expect(
+            TokenType.RSQUARE,
+            'Missing closing square bracket for array reference'
         )
+        return ArrExpNode(
+            kind=ParseTreeNode.ARR_EXP,
+            line_number=name.line,
+            name=name.val,
+            index=index
+        )
+
+    def funcall_factor(self):
+        """Parses a function call expression.  The ID and opening paren have
+        already been matched by :id_factor:.
+
+        """
+        name = self.consume()
+        self.consume()  # matched by id_factor()
+        args = self.args()
+        self.expect(
+            TokenType.RPAREN,
+            'Missing closing paren at function call'
+        )
+        return FunCallExpNode(
+            kind=ParseTreeNode.FUN_CALL_EXP,
+            line_number=name.line,
+            name=name.val,
+            params=args
+        )
+
+    def read_factor(self):
+        """Parses a read expression."""
+        line = self.consume().line
+        self.expect(
+            TokenType.LPAREN,
+            'Missing opening paren at read expression'
+        )
+        self.expect(
+            TokenType.RPAREN,
+            'Missing closing paren at read expression'
+        )
+        return ReadExpNode.get(self.read_nodes, line)
+
+    def deref_factor(self):
+        """Parses a dereferenced variable."""
+        line = self.consume().line
+        return DerefExpNode(
+            kind=ParseTreeNode.DEREF_EXP,
+            line_number=line,
+            exp=self.var()
+        )
+
+    def num_factor(self):
+        """Parses a number expression."""
+        num = self.consume()
+        return IntExpNode.make(num.line, int(num.val))
+
+    def str_factor(self):
+        """Parses a string expression."""
+        string = self.consume()
+        return StrExpNode(
+            kind=ParseTreeNode.STR_EXP,
+            line_number=string.line,
+            val=string.val
+        )
+
+    def paren_factor(self):
+        """Parses a parenthesized expression."""
+        self.consume()
+        exp = self.expression()
+        self.expect(
+            TokenType.RPAREN,
+            'Parenthesized expression must end in right paren'
+        )
+        return exp
 
     def args(self):
         """Parse a function's arguments, if any."""
-        if self.cur_token().typ is TokenType.RPAREN:
+        if self.scan.next_token.typ == TokenType.RPAREN:
             # empty args list
-            return None
+            return []
         return self.args_list()
 
     def args_list(self):
         """Parse a list of function arguments."""
-        head = self.expression()
-        cur = head
-        while self.cur_token().typ is TokenType.COMMA:
+        args = [self.expression()]
+        while self.scan.next_token.typ == TokenType.COMMA:
             self.consume()
-            cur.nxt = self.args_list()
-            cur = cur.nxt
-        return head
+            args.append(self.expression())
+        return args
 
     def var(self):
         """Parse a variable expression."""
         name = self.expect(TokenType.ID, 'var expression must be an ID')
-        return VarExpNode(
-            kind=ParseTreeNode.VAR_EXP,
-            line=name.line,
-            name=name.val
-        )
+        return VarExpNode.make(name.line, name.val)
+
+
+class BPLType(object):
+    """Represents the types in BPL.  Instances are interned: there is
+    exactly one BPLType per type, so types can be compared with `is`.
+    They must never be mutated; addr_of and deref_of hold the related
+    types.
+
+    """
 
+    # addr_of and deref_of are filled in below the class.
+    __slots__ = ('typ', 'addr_of', 'deref_of')
 
-class BPLType():
-    """Represents the types in BPL"""
     INT = 0
     STRING = 1
     VOID = 2
@@ -642,24 +677,30 @@ class BPLType():
     INT_ARR = 5
     STR_ARR = 6
 
-    constants = {
-        0: "INT",
-        1: "STRING",
-        2: "VOID",
-        3: "INT_PTR",
-        4: "STR_PTR",
-        5: "INT_ARR",
-        6: "STR_ARR"
-    }
-
-    def __init__(self, type_string):
-        """Initialize this BPLType from a string describing it's type.'"""
-        if type_string == 'INT':
-            self.typ = self.INT
-        elif type_string == 'STRING':
-            self.typ = self.STRING
-        elif type_string == 'VOID':
-            self.typ = self.VOID
+    # Converts type values to their names, indexed by type.
+    constants = ("INT", "STRING", "VOID", "INT_PTR", "STR_PTR", "INT_ARR", "STR_ARR")
+
+    # Type values of the pointer to, and pointee of, each type that
+    # has one.
+    ADDRESS_OF = {INT: INT_PTR, STRING: STR_PTR}
+    DEREF_OF = {INT_PTR: INT, STR_PTR: STRING}
+
+    # Maps type values to their one instance.
+    interned = {}
+
+    def __new__(cls, type_string):
+        """Return the BPLType described by the string :type_string:."""
+        return cls.of(cls.constants.index(type_string))
+
+    @classmethod
+    def of(cls, typ):
+        """Return the BPLType with type value :typ:."""
+        instance = cls.interned.get(typ)
+        if instance is None:
+            instance = object.__new__(cls)
+            instance.typ = typ
+            cls.interned[typ] = instance
+        return instance
 
     def __eq__(self, other):
         if isinstance(other, self.__class__):
@@ -670,23 +711,24 @@ class BPLType():
     def __ne__(self, other):
         return not self.__eq__(other)
 
+    def __hash__(self):
+        return self.typ
+
     def __str__(self):
-        return '%s' % self.constants[self.typ]
+        return self.constants[self.typ]
 
     def is_pointer(self):
-        return True if self.typ in (BPLType.INT_PTR, BPLType.STR_PTR) else False
-
-    def address(self):
-        if self.typ == self.INT:
-            self.typ = self.INT_PTR
-        elif self.typ == self.STRING:
-            self.typ = self.STR_PTR
-
-    def deref(self):
-        if self.typ == self.INT_PTR:
-            self.typ = self.INT
-        elif self.typ == self.STR_PTR:
-            self.typ = self.STRING
+        return self.typ in self.DEREF_OF
+
+
+# Intern every type up front and link each to the type of its address
+# (addr_of) and the type it dereferences to (deref_of).  Types with no
+# such relative link to themselves.
+for typ in range(len(BPLType.constants)):
+    instance = BPLType.of(typ)
+    instance.addr_of = BPLType.of(BPLType.ADDRESS_OF.get(typ, typ))
+    instance.deref_of = BPLType.of(BPLType.DEREF_OF.get(typ, typ))
+del typ, instance
 
 
 class ParseException(Exception):
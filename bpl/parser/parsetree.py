@@ -1,8 +1,46 @@
-class ParseTreeNode():
+import weakref
+
+# Node -> dump() string, filled by ParseTreeNode.__str__.  Entries go away
+# with their nodes; see :clear_str_cache:.
+_STR_CACHE = weakref.WeakKeyDictionary()
+
+# Node kind -> name, in kind order (see the kinds on ParseTreeNode).
+_KIND_NAMES = (
+    'FUN_DEC',
+    'VAR_DEC',
+    'ARR_DEC',
+    'COMP_STMT',
+    'EXPR_STMT',
+    'IF_STMT',
+    'WHILE_STMT',
+    'RET_STMT',
+    'WRITE_STMT',
+    'WRITELN_STMT',
+    'VAR_EXP',
+    'ARR_EXP',
+    'ADDR_EXP',
+    'DEREF_EXP',
+    'FUN_CALL_EXP',
+    'READ_EXP',
+    'ASSIGN_EXP',
+    'COMP_EXP',
+    'ARITH_EXP',
+    'NEG_EXP',
+    'INT_EXP',
+    'STR_EXP'
+)
+
+
+class ParseTreeNode(object):
     """Represents a node in the parse-tree.  Inherited by more specific
     parse tree node classes.
 
     """
+
+    # base_string caches base_str(); it is only filled in when a node is
+    # first printed.  __weakref__ lets nodes key _STR_CACHE.
+    __slots__ = ('kind', 'line_number', 'base_string', '__weakref__')
+
     # Node 'kinds' represent the particular type of parse tree node, defined by
     # our grammar rules.
     FUN_DEC = 0
@@ -28,66 +66,40 @@ class ParseTreeNode():
     INT_EXP = 20
     STR_EXP = 21
 
-    constants = {
-        0: 'FUN_DEC',
-        1: 'VAR_DEC',
-        2: 'ARR_DEC',
-        3: 'COMP_STMT',
-        4: 'EXPR_STMT',
-        5: 'IF_STMT',
-        6: 'WHILE_STMT',
-        7: 'RET_STMT',
-        8: 'WRITE_STMT',
-        9: 'WRITELN_STMT',
-        10: 'VAR_EXP',
-        11: 'ARR_EXP',
-        12: 'ADDR_EXP',
-        13: 'DEREF_EXP',
-        14: 'FUN_CALL_EXP',
-        15: 'READ_EXP',
-        16: 'ASSIGN_EXP',
-        17: 'COMP_EXP',
-        18: 'ARITH_EXP',
-        19: 'NEG_EXP',
-        20: 'INT_EXP',
-        21: 'STR_EXP'
-    }
-
-    def __init__(self, kind, line_number, nxt=None):
+    # Converts kinds to their names, indexed by kind.
+    constants = _KIND_NAMES
+
+    def __init__(self, kind, line_number):
         """Initializes a parse tree node.
 
         :kind: The kind of grammar node we are.
         :line_number: This node's line number.
-        :nxt: The next tree node.
 
         """
         self.kind = kind
         self.line_number = line_number
-        self.nxt = nxt
 
     def base_str(self):
-        return '%s (Line: %d)' % (
-            self.constants[self.kind],
-            self.line_number
-        )
+        try:
+            return self.base_string
+        except AttributeError:
+            self.base_string = '%s (Line: %d)' % (
+                _KIND_NAMES[self.kind],
+                self.line_number
+            )
+            return self.base_string
 
     def to_string(self):
-        return '%s\n' % self.base_str()
+        return str(self)
 
     def __str__(self):
-        ret = ''
-        cur = self
-        while cur is not None:
-            ret += cur.to_string()
-            cur = cur.nxt
-        return ret
-
-    def __iter__(self):
-        """Steps along linked lists in the AST."""
-        yield self
-        if self.nxt is not None:
-            for each in self.nxt:
-                yield each
+        try:
+            return _STR_CACHE[self]
+        except KeyError:
+            buf = []
+            dump(self, buf)
+            _STR_CACHE[self] = ret = ''.join(buf)
+            return ret
 
 #######################
 #  Declaration Nodes  #
@@ -97,7 +109,11 @@ class ParseTreeNode():
 class DecNode(ParseTreeNode):
     """Represents a declaration node in the parse tree."""
 
-    def __init__(self, kind, line_number, name, typ, nxt=None):
+    # is_global is assigned by the type checker, offset by the code
+    # generator.
+    __slots__ = ('name', 'typ', 'is_global', 'offset')
+
+    def __init__(self, kind, line_number, name, typ):
         """Initializes a Declaration node.
 
         :name: The name of the represented variable/function.
@@ -105,7 +121,7 @@ class DecNode(ParseTreeNode):
         type for function declarations.
 
         """
-        ParseTreeNode.__init__(self, kind, line_number, nxt)
+        ParseTreeNode.__init__(self, kind, line_number)
         self.name = name
         self.typ = typ
 
@@ -113,69 +129,52 @@ class DecNode(ParseTreeNode):
 class FunDecNode(DecNode):
     """Represents a function declaration node in the parse tree."""
 
-    def __init__(self, kind, line_number, name, typ, params, body, nxt=None):
+    # locals_size and ret_label are assigned by the code generator.
+    __slots__ = ('params', 'body', 'locals_size', 'ret_label')
+
+    def __init__(self, kind, line_number, name, typ, params, body):
         """Initialize a function declaration node.
 
-        :params: A DecNode representing function parameters.
+        :params: A list of DecNodes representing function parameters.
         :body: A CompStmtNode representing the function's body.
 
         """
-        DecNode.__init__(self, kind, line_number, name, typ, nxt)
+        DecNode.__init__(self, kind, line_number, name, typ)
         self.params = params
         self.body = body
 
-    def to_string(self):
-        return '%s, Name: %s, Return Type: [%s]\nParams:\n%s\nBody:\n%s\n' % (
-            self.base_str(),
-            self.name,
-            self.typ,
-            indent(self.params),
-            indent(self.body)
-        )
-
 
 class VarDecNode(DecNode):
     """Represents a variable declaration node in the parse tree."""
 
-    def __init__(self, kind, line_number, name, typ, is_pointer=False, nxt=None):
+    __slots__ = ('is_pointer',)
+
+    def __init__(self, kind, line_number, name, typ, is_pointer=False):
         """Initialize a variable declaration node.
 
         :is_pointer: Whether we're declaring a pointer or not.
 
         """
-        DecNode.__init__(self, kind, line_number, name, typ, nxt)
+        DecNode.__init__(self, kind, line_number, name, typ)
         self.is_pointer = is_pointer
 
-    def to_string(self):
-        return '%s%s, Name: %s, Type: [%s]\n' % (
-            self.base_str(),
-            ' *pointer*' if self.is_pointer else '',
-            self.name,
-            self.typ
-        )
-
 
 class ArrDecNode(VarDecNode):
     """Represents an array declaration node in the parse tree."""
 
-    def __init__(self, kind, line_number, name, typ, size, nxt=None):
+    __slots__ = ('size',)
+
+    def __init__(self, kind, line_number, name, typ, size):
         """Initialize an array declaration node.
 
         :size: Size of the array.
 
         """
         VarDecNode.__init__(
-            self, kind, line_number, name, typ, is_pointer=False, nxt=nxt
+            self, kind, line_number, name, typ, is_pointer=False
         )
         self.size = size
 
-    def to_string(self):
-        return '%s, Name: %s, Type: [%s], Size: %s\n' % (
-            self.base_str(),
-            self.name,
-            self.typ,
-            self.size
-        )
 
 #####################
 #  Statement Nodes  #
@@ -185,33 +184,33 @@ class ArrDecNode(VarDecNode):
 class StmtNode(ParseTreeNode):
     """Represents a statement node in the parse tree."""
 
-    def __init__(self, kind, line_number, nxt=None):
-        ParseTreeNode.__init__(self, kind, line_number, nxt)
+    __slots__ = ()
+
+    def __init__(self, kind, line_number):
+        ParseTreeNode.__init__(self, kind, line_number)
 
 
 class ExpStmtNode(StmtNode):
     """Represents an expression statement node in the parse tree."""
 
-    def __init__(self, kind, line_number, expr, nxt=None):
+    __slots__ = ('expr',)
+
+    def __init__(self, kind, line_number, expr):
         """Initialize an if statement node.
 
         :expr: The expression that this statement represents.
 
         """
-        StmtNode.__init__(self, kind, line_number, nxt)
+        StmtNode.__init__(self, kind, line_number)
         self.expr = expr
 
-    def to_string(self):
-        return '%s\nExpression:\n%s\n' % (
-            self.base_str(),
-            indent(self.expr)
-        )
-
 
 class IfStmtNode(StmtNode):
     """Represents an if statement node in the parse tree."""
 
-    def __init__(self, kind, line_number, cond, true_body, false_body, nxt=None):
+    __slots__ = ('cond', 'true_body', 'false_body')
+
+    def __init__(self, kind, line_number, cond, true_body, false_body):
         """Initialize an if statement node.
 
         :cond: The if statement's conditional expression.
@@ -219,109 +218,100 @@ class IfStmtNode(StmtNode):
         :false_body: The statement to be executed when the condition is false.
 
         """
-        StmtNode.__init__(self, kind, line_number, nxt)
+        StmtNode.__init__(self, kind, line_number)
         self.cond = cond
         self.true_body = true_body
         self.false_body = false_body
 
-    def to_string(self):
-        return '%s\nCondition:\n%s\nTrue Body:\n%s\nFalse Body:\n%s\n' % (
-            self.base_str(),
-            indent(self.cond),
-            indent(self.true_body),
-            indent(self.false_body)
-        )
-
 
 class WhileStmtNode(StmtNode):
     """Represents a while statement node in the parse tree."""
 
-    def __init__(self, kind, line_number, cond, body, nxt=None):
+    __slots__ = ('cond', 'body')
+
+    def __init__(self, kind, line_number, cond, body):
         """Initialize a while statement node.
 
         :cond: The while statement's conditional expression.
         :body: The statement to be executed while the condition is true.
 
         """
-        StmtNode.__init__(self, kind, line_number, nxt)
+        StmtNode.__init__(self, kind, line_number)
         self.cond = cond
         self.body = body
 
-    def to_string(self):
-        return '%s\nCondition:\n%s\nBody:\n%s\n' % (
-            self.base_str(),
-            indent(self.cond),
-            indent(self.body)
-        )
-
 
 class CompStmtNode(StmtNode):
     """Represents a compound statement node in the parse tree."""
 
-    def __init__(self, kind, line_number, local_decs, stmt_list, nxt=None):
+    __slots__ = ('local_decs', 'stmt_list')
+
+    def __init__(self, kind, line_number, local_decs, stmt_list):
         """Initialize a compound statement node.
 
-        :local_decs: A list of local declarations, beginning with a declaration
-        node.
-        :stmt_list: A list of statements, beginning with a statement node.
+        :local_decs: A list of local declaration nodes.
+        :stmt_list: A list of statement nodes.
 
         """
-        StmtNode.__init__(self, kind, line_number, nxt)
+        StmtNode.__init__(self, kind, line_number)
         self.local_decs = local_decs
         self.stmt_list = stmt_list
 
-    def to_string(self):
-        return '%s\nLocal Declarations:\n%s\nStatement List:\n%s\n' % (
-            self.base_str(),
-            indent(self.local_decs),
-            indent(self.stmt_list)
-        )
-
 
 class RetStmtNode(StmtNode):
     """Represents a return statement node in the parse tree."""
 
-    def __init__(self, kind, line_number, val, nxt=None):
+    __slots__ = ('val',)
+
+    def __init__(self, kind, line_number, val):
         """Initializes a return statement node.
 
         :val: The expression who'se value we're returning.
 
         """
-        StmtNode.__init__(self, kind, line_number, nxt)
+        StmtNode.__init__(self, kind, line_number)
         self.val = val
 
-    def to_string(self):
-        return '%s\nReturn Value:\n%s\n' % (
-            self.base_str(),
-            indent(self.val)
-        )
-
 
 class WriteStmtNode(StmtNode):
     """Represents a write statement node in the parse tree."""
 
-    def __init__(self, kind, line_number, expr, nxt=None):
+    __slots__ = ('expr',)
+
+    def __init__(self, kind, line_number, expr):
         """Initializes a write statement node.
 
         :expr: The expression who'se value we're writing.
 
         """
-        StmtNode.__init__(self, kind, line_number, nxt)
+        StmtNode.__init__(self, kind, line_number)
         self.expr = expr
 
-    def to_string(self):
-        return '%s\nValue:\n%s\n' % (
-            self.base_str(),
-            indent(self.expr)
-        )
-
 
 class WritelnStmtNode(StmtNode):
     """Represents a writeln statement node in the parse tree."""
 
-    def __init__(self, kind, line_number, nxt=None):
+    __slots__ = ()
+
+    def __init__(self, kind, line_number):
         """Initializes a writeln statement node."""
-        StmtNode.__init__(self, kind, line_number, nxt)
+        StmtNode.__init__(self, kind, line_number)
+
+    @classmethod
+    def get(cls, instances, line_number):
+        """Returns the writeln statement node for :line_number: from the
+        dict :instances:, adding it if needed.  The node carries nothing but
+        its line, so one instance is shared by every writeln on a line.
+        Each parser passes its own dict, so parses never share nodes.
+
+        """
+        try:
+            return instances[line_number]
+        except KeyError:
+            node = instances[line_number] = cls(
+                ParseTreeNode.WRITELN_STMT, line_number
+            )
+            return node
 
 
 ######################
@@ -331,42 +321,55 @@ class WritelnStmtNode(StmtNode):
 class ExpNode(ParseTreeNode):
     """Represents an expression node in the parse tree."""
 
-    def __init__(self, kind, line_number, nxt=None):
+    # typ is assigned by the type checker; it stays None until the node
+    # has been checked.
+    __slots__ = ('typ',)
+
+    def __init__(self, kind, line_number):
         """Initializes an expression node."""
-        ParseTreeNode.__init__(self, kind, line_number, nxt)
+        ParseTreeNode.__init__(self, kind, line_number)
+        self.typ = None
 
 
 class IntExpNode(ExpNode):
     """Represents an integer expression node in the parse tree."""
 
-    def __init__(self, kind, line_number, val, nxt=None):
+    __slots__ = ('val',)
+
+    def __init__(self, kind, line_number, val):
         """Initializes an integer expression node.
 
         :val: Integer value that this node represents.
 
         """
-        ExpNode.__init__(self, kind, line_number, nxt)
+        ExpNode.__init__(self, kind, line_number)
         self.val = val
 
-    def to_string(self):
-        return '%s, Value: %s\n' % (self.base_str(), self.val)
+    @classmethod
+    def make(cls, line_number, val):
+        """Fast alternative to the constructor; see :OpExpNode.make:."""
+        node = object.__new__(cls)
+        node.kind = ParseTreeNode.INT_EXP
+        node.line_number = line_number
+        node.val = val
+        node.typ = None
+        return node
 
 
 class StrExpNode(ExpNode):
     """Represents a string expression node in the parse tree."""
 
-    def __init__(self, kind, line_number, val, nxt=None):
+    __slots__ = ('val',)
+
+    def __init__(self, kind, line_number, val):
         """Initializes a string expression node.
 
         :val: String value that this node represents.
 
         """
-        ExpNode.__init__(self, kind, line_number, nxt)
+        ExpNode.__init__(self, kind, line_number)
         self.val = val
 
-    def to_string(self):
-        return '%s, Value: \"%s\"\n' % (self.base_str(), self.val)
-
 
 class OpExpNode(ExpNode):
     """Represents an operator expression node in the parse tree.  This
@@ -377,7 +380,9 @@ class OpExpNode(ExpNode):
     :kind:'s of this node can be (TODO)
     """
 
-    def __init__(self, kind, line_number, op, l_exp, r_exp, nxt=None):
+    __slots__ = ('op', 'l_exp', 'r_exp')
+
+    def __init__(self, kind, line_number, op, l_exp, r_exp):
         """Initializes a variable expression node.
 
         :op: A token representing the operator.
@@ -385,151 +390,333 @@ class OpExpNode(ExpNode):
         :r_exp: The right expression.
 
         """
-        ExpNode.__init__(self, kind, line_number, nxt)
+        ExpNode.__init__(self, kind, line_number)
         self.op = op
         self.l_exp = l_exp
         self.r_exp = r_exp
 
-    def to_string(self):
-        return '%s, Operator: [%s]\nLeft Expression:\n%s\nRight Expression:\n%s\n' % (
-            self.base_str(),
-            self.op,
-            indent(self.l_exp),
-            indent(self.r_exp)
-        )
+    @classmethod
+    def make(cls, kind, line_number, op, l_exp, r_exp):
+        """Fast alternative to the constructor for the parser's hot
+        expression productions.  Sets the fields directly instead of
+        binding keyword arguments through the chain of __init__s.
+
+        """
+        node = object.__new__(cls)
+        node.kind = kind
+        node.line_number = line_number
+        node.op = op
+        node.l_exp = l_exp
+        node.r_exp = r_exp
+        node.typ = None
+        return node
 
 
 class FunCallExpNode(ExpNode):
     """Represents a function call node in the parse tree."""
 
-    def __init__(self, kind, line_number, name, params, nxt=None):
+    # dec is linked to the declaration by the type checker; it stays None
+    # until then.
+    __slots__ = ('name', 'params', 'dec')
+
+    def __init__(self, kind, line_number, name, params):
         """Initializes a function call node.
 
         :name: The string name of the function.
-        :params: An expression node representing the list of
+        :params: A list of expression nodes representing the
         parameters to the function call.
 
         """
-        ExpNode.__init__(self, kind, line_number, nxt)
+        ExpNode.__init__(self, kind, line_number)
         self.name = name
         self.params = params
-
-    def to_string(self):
-        return '%s, Name: %s\nArguments:\n%s\n' % (
-            self.base_str(),
-            self.name,
-            indent(self.params)
-        )
+        self.dec = None
 
 
 class ReadExpNode(ExpNode):
     """Represents a read node in the parse tree."""
 
-    def __init__(self, kind, line_number, nxt=None):
+    __slots__ = ()
+
+    def __init__(self, kind, line_number):
         """Initializes a read expression node."""
-        ExpNode.__init__(self, kind, line_number, nxt)
+        ExpNode.__init__(self, kind, line_number)
+
+    @classmethod
+    def get(cls, instances, line_number):
+        """Returns the read expression node for :line_number: from the
+        dict :instances:, adding it if needed.  The node carries nothing but
+        its line (and the type checker always types it INT), so one instance
+        is shared by every read on a line.  Each parser passes its own dict,
+        so parses never share nodes.
+
+        """
+        try:
+            return instances[line_number]
+        except KeyError:
+            node = instances[line_number] = cls(
+                ParseTreeNode.READ_EXP, line_number
+            )
+            return node
 
 
 class VarExpNode(ExpNode):
     """Represents a variable expression node in the parse tree."""
 
-    def __init__(self, kind, line_number, name, nxt=None):
+    # dec is linked to the declaration by the type checker; it stays None
+    # until then.
+    __slots__ = ('name', 'dec')
+
+    def __init__(self, kind, line_number, name):
         """Initializes a variable expression node.
 
         :name: The string name of this variable.
 
         """
-        ExpNode.__init__(self, kind, line_number, nxt)
+        ExpNode.__init__(self, kind, line_number)
         self.name = name
+        self.dec = None
 
-    def to_string(self):
-        return '%s, Name: %s\n' % (self.base_str(), self.name)
+    @classmethod
+    def make(cls, line_number, name):
+        """Fast alternative to the constructor; see :OpExpNode.make:."""
+        node = object.__new__(cls)
+        node.kind = ParseTreeNode.VAR_EXP
+        node.line_number = line_number
+        node.name = name
+        node.typ = None
+        node.dec = None
+        return node
 
 
 class ArrExpNode(ExpNode):
     """Represents an array expression node in the parse tree."""
 
-    def __init__(self, kind, line_number, name, index, nxt=None):
+    # dec is linked to the declaration by the type checker; it stays None
+    # until then.
+    __slots__ = ('name', 'index', 'dec')
+
+    def __init__(self, kind, line_number, name, index):
         """Initializes an array expression node.
 
         :name: The string name of this array.
         :index: An expression node who'se value indexes this array.
 
         """
-        ExpNode.__init__(self, kind, line_number, nxt)
+        ExpNode.__init__(self, kind, line_number)
         self.name = name
         self.index = index
-
-    def to_string(self):
-        return '%s, Name: %s\nIndex:\n%s\n' % (
-            self.base_str(), self.name, indent(self.index)
-        )
+        self.dec = None
 
 
 class AddrExpNode(ExpNode):
     """Represents an address node in the parse tree."""
 
-    def __init__(self, kind, line_number, exp, nxt=None):
+    __slots__ = ('exp',)
+
+    def __init__(self, kind, line_number, exp):
         """Initializes an address expression node.
 
         :exp: The expression who'se address we're referencing
 
         """
-        ExpNode.__init__(self, kind, line_number, nxt)
+        ExpNode.__init__(self, kind, line_number)
         self.exp = exp
 
-    def to_string(self):
-        return '%s\nExpression:\n%s\n' % (
-            self.base_str(), indent(self.exp)
-        )
-
 
 class DerefExpNode(ExpNode):
     """Represents a dereference node in the parse tree."""
 
-    def __init__(self, kind, line_number, exp, nxt=None):
+    __slots__ = ('exp',)
+
+    def __init__(self, kind, line_number, exp):
         """Initializes a dereference expression node.
 
         :exp: The expression which we're dereferencing
 
         """
-        ExpNode.__init__(self, kind, line_number, nxt)
+        ExpNode.__init__(self, kind, line_number)
         self.exp = exp
 
-    def to_string(self):
-        return '%s\nExpression:\n%s\n' % (
-            self.base_str(), indent(self.exp)
-        )
-
 
 class NegExpNode(ExpNode):
     """Represents a negated node in the parse tree."""
 
-    def __init__(self, kind, line_number, exp, nxt=None):
+    __slots__ = ('exp',)
+
+    def __init__(self, kind, line_number, exp):
         """Initializes a negated expression node.
 
         :exp: The expression which we're negating
 
         """
-        ExpNode.__init__(self, kind, line_number, nxt)
+        ExpNode.__init__(self, kind, line_number)
         self.exp = exp
 
-    def to_string(self):
-        return '%s\nExpression:\n%s\n' % (
-            self.base_str(),
-            indent(self.exp)
-        )
+###########################
+#  String Representation  #
+###########################
+
+# Each function describes how a node of a given kind is shown: a header
+# line and a sequence of (label, child) sections, where a child may be a
+# node, a list of nodes, or None.  They are looked up by kind in
+# _STR_DISPATCH and laid out by :dump:.
+
+
+def _str_base(node):
+    return node.base_str(), ()
+
+
+def _str_fun_dec(node):
+    return '%s, Name: %s, Return Type: [%s]' % (
+        node.base_str(),
+        node.name,
+        node.typ
+    ), (('Params:', node.params), ('Body:', node.body))
+
+
+def _str_var_dec(node):
+    return '%s%s, Name: %s, Type: [%s]' % (
+        node.base_str(),
+        ' *pointer*' if node.is_pointer else '',
+        node.name,
+        node.typ
+    ), ()
+
+
+def _str_arr_dec(node):
+    return '%s, Name: %s, Type: [%s], Size: %s' % (
+        node.base_str(),
+        node.name,
+        node.typ,
+        node.size
+    ), ()
 
 
-def indent(s):
-    """Returns the indented string representation of :s: by putting a pipe
-    and one space before each line.
+def _str_comp_stmt(node):
+    return node.base_str(), (
+        ('Local Declarations:', node.local_decs),
+        ('Statement List:', node.stmt_list)
+    )
+
+
+def _str_expr_stmt(node):
+    return node.base_str(), (('Expression:', node.expr),)
+
+
+def _str_if_stmt(node):
+    return node.base_str(), (
+        ('Condition:', node.cond),
+        ('True Body:', node.true_body),
+        ('False Body:', node.false_body)
+    )
+
+
+def _str_while_stmt(node):
+    return node.base_str(), (('Condition:', node.cond), ('Body:', node.body))
+
+
+def _str_ret_stmt(node):
+    return node.base_str(), (('Return Value:', node.val),)
+
+
+def _str_write_stmt(node):
+    return node.base_str(), (('Value:', node.expr),)
+
+
+def _str_var_exp(node):
+    return '%s, Name: %s' % (node.base_str(), node.name), ()
+
+
+def _str_arr_exp(node):
+    return '%s, Name: %s' % (node.base_str(), node.name), (
+        ('Index:', node.index),
+    )
+
+
+def _str_unary_exp(node):
+    """Address, dereference, and negated expressions."""
+    return node.base_str(), (('Expression:', node.exp),)
+
+
+def _str_fun_call_exp(node):
+    return '%s, Name: %s' % (node.base_str(), node.name), (
+        ('Arguments:', node.params),
+    )
+
+
+def _str_op_exp(node):
+    return '%s, Operator: [%s]' % (node.base_str(), node.op), (
+        ('Left Expression:', node.l_exp),
+        ('Right Expression:', node.r_exp)
+    )
+
+
+def _str_int_exp(node):
+    return '%s, Value: %s' % (node.base_str(), node.val), ()
+
+
+def _str_str_exp(node):
+    return '%s, Value: \"%s\"' % (node.base_str(), node.val), ()
+
+
+# Node kind -> string function, filled once at import.
+_STR_DISPATCH = [None] * len(_KIND_NAMES)
+_STR_DISPATCH[ParseTreeNode.FUN_DEC] = _str_fun_dec
+_STR_DISPATCH[ParseTreeNode.VAR_DEC] = _str_var_dec
+_STR_DISPATCH[ParseTreeNode.ARR_DEC] = _str_arr_dec
+_STR_DISPATCH[ParseTreeNode.COMP_STMT] = _str_comp_stmt
+_STR_DISPATCH[ParseTreeNode.EXPR_STMT] = _str_expr_stmt
+_STR_DISPATCH[ParseTreeNode.IF_STMT] = _str_if_stmt
+_STR_DISPATCH[ParseTreeNode.WHILE_STMT] = _str_while_stmt
+_STR_DISPATCH[ParseTreeNode.RET_STMT] = _str_ret_stmt
+_STR_DISPATCH[ParseTreeNode.WRITE_STMT] = _str_write_stmt
+_STR_DISPATCH[ParseTreeNode.WRITELN_STMT] = _str_base
+_STR_DISPATCH[ParseTreeNode.VAR_EXP] = _str_var_exp
+_STR_DISPATCH[ParseTreeNode.ARR_EXP] = _str_arr_exp
+_STR_DISPATCH[ParseTreeNode.ADDR_EXP] = _str_unary_exp
+_STR_DISPATCH[ParseTreeNode.DEREF_EXP] = _str_unary_exp
+_STR_DISPATCH[ParseTreeNode.FUN_CALL_EXP] = _str_fun_call_exp
+_STR_DISPATCH[ParseTreeNode.READ_EXP] = _str_base
+_STR_DISPATCH[ParseTreeNode.ASSIGN_EXP] = _str_op_exp
+_STR_DISPATCH[ParseTreeNode.COMP_EXP] = _str_op_exp
+_STR_DISPATCH[ParseTreeNode.ARITH_EXP] = _str_op_exp
+_STR_DISPATCH[ParseTreeNode.NEG_EXP] = _str_unary_exp
+_STR_DISPATCH[ParseTreeNode.INT_EXP] = _str_int_exp
+_STR_DISPATCH[ParseTreeNode.STR_EXP] = _str_str_exp
+
+
+def dump(node, out, level=0):
+    """Appends the lines of the tree rooted at :node: to the list :out:,
+    each prefixed with one pipe and one space per level of nesting,
+    starting at :level:.  The tree is walked with an explicit stack, so
+    deep trees don't run into the recursion limit.
 
     """
-    if s is None:
-        return None
+    stack = [(node, level)]
+    while stack:
+        item, level = stack.pop()
+        if isinstance(item, str):
+            # a section label, or 'None' for an empty child
+            out.append('| ' * level + item + '\n')
+            continue
+        header, sections = _STR_DISPATCH[item.kind](item)
+        out.append('| ' * level + header + '\n')
+        # push in reverse so the sections come off the stack in order
+        for label, child in reversed(sections):
+            if not child:
+                stack.append(('None', level))
+            elif isinstance(child, list):
+                for each in reversed(child):
+                    stack.append((each, level + 1))
+            else:
+                stack.append((child, level + 1))
+            stack.append((label, level))
+
+
+def clear_str_cache():
+    """Forget the cached string representations of all nodes.  Call this
+    after changing a tree that has already been printed.
 
-    indented = ''
-    for line in str(s).splitlines():
-        indented += "| %s\n" % line
-    return indented[:-1]
+    """
+    _STR_CACHE.clear()
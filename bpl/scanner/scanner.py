@@ -1,5 +1,71 @@
+import mmap
+import os
+import re
+import stat
+import sys
+
 from bpl.scanner.token import TokenType, Token
 
+# One alternative per kind of token (or of scan error), tried in order at
+# each position.  The last alternative matches any character, so the
+# matches cover the input with no gaps and every character is dealt with
+# by exactly one of them.
+#
+# Comments and string literals are matched as runs of characters that
+# can't end them, so the engine moves through their bodies without
+# backtracking (a lazy '.*?' would retry the terminator at every
+# character).
+_TOKEN_RE = re.compile(r"""
+    (?P<SPACE>[ \t\r\x0b\x0c]+)
+  | (?P<NEWLINES>\n[ \t\n\r\x0b\x0c]*)
+  | (?P<IDENT>[A-Za-z][A-Za-z0-9_]*)
+  | (?P<COMMENT>/\*[^*]*\*+(?:[^/*][^*]*\*+)*/)
+  | (?P<UNCLOSED_COMMENT>/\*)
+  | (?P<SYMBOL>%s)
+  | (?P<NUMBER>[0-9]+)
+  | (?P<STRING>"[^"\n]*")
+  | (?P<UNCLOSED_STRING>"[^"\n]*)
+  | (?P<UNKNOWN_SYMBOL>[%s])
+  | (?P<UNKNOWN>[\s\S])
+""" % (
+    # longest first, so two-character symbols win over their prefixes
+    '|'.join(re.escape(sym) for sym in sorted(TokenType.Symbols, key=len,
+                                               reverse=True)),
+    # characters that only begin two-character symbols
+    re.escape(''.join(set(sym[0] for sym in TokenType.Symbols)
+                      - set(sym for sym in TokenType.Symbols
+                            if len(sym) == 1)))
+), re.VERBOSE)
+
+# Group numbers of the alternatives the scanner dispatches on.
+_SPACE = _TOKEN_RE.groupindex['SPACE']
+_NEWLINES = _TOKEN_RE.groupindex['NEWLINES']
+_IDENT = _TOKEN_RE.groupindex['IDENT']
+_COMMENT = _TOKEN_RE.groupindex['COMMENT']
+_UNCLOSED_COMMENT = _TOKEN_RE.groupindex['UNCLOSED_COMMENT']
+_SYMBOL = _TOKEN_RE.groupindex['SYMBOL']
+_NUMBER = _TOKEN_RE.groupindex['NUMBER']
+_STRING = _TOKEN_RE.groupindex['STRING']
+_UNCLOSED_STRING = _TOKEN_RE.groupindex['UNCLOSED_STRING']
+_UNKNOWN_SYMBOL = _TOKEN_RE.groupindex['UNKNOWN_SYMBOL']
+
+# Sources larger than this many bytes are mapped rather than read.  Only
+# Python 2 maps them: Python 3 has to decode the source, which copies it
+# anyway.
+_MMAP_THRESHOLD = 1 << 20
+_CAN_MMAP = bytes is str
+
+# Size of each read after the first, for sources whose size fstat doesn't
+# give (pipes and other special files).
+_READ_SIZE = 1 << 16
+
+# Symbol text -> (TokenType, the Symbols key for that text).
+_SYMBOL_TOKENS = dict((sym, (typ, sym))
+                      for sym, typ in TokenType.Symbols.items())
+
+# intern is a builtin on Python 2 and lives in sys on Python 3.
+_intern = getattr(sys, 'intern', None) or intern
+
 
 class Scanner():
     """A scanner class to tokenize BPL programs.
@@ -7,174 +73,188 @@ class Scanner():
     Calls to :get_next_token: set an instance variable, :next_token:, which is
     a Token object representing the current token from the input program.  It
     is important to note that :next_token: does not exist until the first call
-    to :get_next_token:.
+    to :get_next_token:.  :peek_next: returns the token after :next_token:
+    without advancing.
 
-    Alternatively, the instance variable :tokens:, a generator, can be used to
-    access the input program's tokens as an iterable sequence.
+    The whole input program is scanned when the scanner is created, and
+    the instance variable :tokens: holds the resulting list of Token
+    objects.  A scan error is held back and raised by :get_next_token: or
+    :peek_next: once the tokens before it have been handed out, so errors
+    surface at the same point in parsing as they would with lazy scanning.
     """
 
     def __init__(self, filename):
         """Initialize a scanner which reads from :filename:"""
         self.filename = filename
-        self.tokens = self._next_token_gen()
+        self.tokens = []
+        self.error = None
+        try:
+            self._scan_all(self.tokens)
+        except ScanException as e:
+            self.error = e
+        # index into :tokens: of the token after :next_token:
+        self.index = 0
+
+    def __iter__(self):
+        """Iterates over every token in the input program, ending with the
+        EOF token.  A scan error is raised once the tokens before it have
+        been produced.  Iterating doesn't move :next_token:.
+        """
+        for token in self.tokens:
+            yield token
+        if self.error is not None:
+            raise self.error
 
     def get_next_token(self):
-        """Grabs the next token from :tokens: and saves it to :next_token:.
-        If :tokens: is empty, just set :next_token: to None.
+        """Saves the next token from :tokens: to :next_token:.  Past the end
+        of :tokens:, :next_token: is left as it was (the EOF token).
+        """
+        if self.index < len(self.tokens):
+            self.next_token = self.tokens[self.index]
+            self.index += 1
+        elif self.error is not None:
+            raise self.error
+
+    def peek_next(self):
+        """Returns the token following :next_token: without advancing.  Past
+        the end of input this is :next_token: itself (the EOF token).
+        """
+        if self.index < len(self.tokens):
+            return self.tokens[self.index]
+        elif self.error is not None:
+            raise self.error
+        return self.next_token
+
+    def _scan_all(self, tokens):
+        """Appends a Token object to :tokens: for every token in :filename:,
+        ending with the EOF token.  On a scan error, :tokens: holds the
+        tokens before it and a ScanException is raised.
+
+        The scan walks the matches of :_TOKEN_RE: over the whole input,
+        so each token (or run of whitespace, or comment) is consumed by a
+        single regular expression match, and dispatches on which
+        alternative matched.
         """
+        # Read the whole file, with the first read sized from fstat, or
+        # map it if it is a large regular file, which saves copying it.
+        # Either way buf supports slicing, find and regular expression
+        # matching.  Pipes and other special files report no useful size,
+        # so they are read until os.read comes back empty.
+        fd = os.open(self.filename, os.O_RDONLY)
         try:
-            self.next_token = next(self.tokens)
-        except StopIteration:
-            pass
+            st = os.fstat(fd)
+            mapped = (_CAN_MMAP and stat.S_ISREG(st.st_mode)
+                      and st.st_size > _MMAP_THRESHOLD)
+            if mapped:
+                buf = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+            else:
+                chunks = []
+                chunk = os.read(fd, max(st.st_size, _READ_SIZE))
+                while chunk:
+                    chunks.append(chunk)
+                    chunk = os.read(fd, _READ_SIZE)
+                buf = b''.join(chunks)
+        finally:
+            os.close(fd)
 
-    def _next_token_gen(self):
-        """Returns a generator to iterate over Token objects for every token in
-        :filename:.
+        # token values are copied out of buf, so a map is closed as soon
+        # as the scan ends, whether or not it hit an error
+        try:
+            self._scan_buf(buf, tokens)
+        finally:
+            if mapped:
+                buf.close()
 
-        The generator tokenizes the input program using a simple DFA algorithm.
+    def _scan_buf(self, buf, tokens):
+        """Appends a Token object to :tokens: for every token in the source
+        text :buf:, as described for :_scan_all:.
         """
-        with open(self.filename) as f:
-            # keep track of our current buffer index and line number.
-            # line_begin is the index of the first byte of the
-            # line. (this helps us print error messages)
-            buf = f.read()
-            i = 0
-            line_begin = 0
-            line = 1
-
-            # the 'states' for our DFA
-            START   = 0
-            KEY_ID  = 1
-            NUMBER  = 2
-            STRLIT  = 3
-            SYMBOL  = 4
-            COMMENT = 5
-
-            # the current token's string value
-            cur_str = ''
-
-            state = START
-
-            while i < len(buf):
-                # We're in the start state if we've either just begun
-                # scanning or just accepted a token.  Otherwise, we're
-                # in one of the other five states corresponding to the
-                # type of token we're reading in.
-                if state == START:
-                    # skip whitespace, count newlines
-                    if buf[i].isspace():
-                        if buf[i] == '\n':
-                            line += 1
-                            line_begin = i
-                        i += 1
-                        continue
-                    # comment
-                    if i < len(buf) - 1 and buf[i] == '/' and buf[i+1] == '*':
-                        state = COMMENT
-                        i += 2
-                    # string literal
-                    elif buf[i] == '\"':
-                        state = STRLIT
-                        i += 1
-                    # keyword or id
-                    elif buf[i].isalpha():
-                        cur_str += buf[i]
-                        state = KEY_ID
-                        i += 1
-                    # symbol
-                    elif [sym for sym in TokenType.Symbols
-                          if sym.startswith(cur_str + buf[i])]:
-                        cur_str += buf[i]
-                        state = SYMBOL
-                        i += 1
-                    # number
-                    elif buf[i].isdigit():
-                        cur_str += buf[i]
-                        state = NUMBER
-                        i += 1
-                    else:
-                        raise ScanException('%s:%d:%d: Unknown character %s'
-                                            % (self.filename, line, i - line_begin, buf[i]))
-
-                elif state == COMMENT:
-                    if buf[i] == '\n':
-                        line += 1
-                        line_begin = i
-                    if i < len(buf) - 1 and buf[i] == '*' and buf[i+1] == '/':
-                        i += 2
-                        state = START
-                    else:
-                        i += 1
-
-                elif state == STRLIT:
-                    if buf[i] == '\n':
-                        raise ScanException('%s:%d:%d: Unexpected newline in string literal'
-                                            % (self.filename, line, i - line_begin))
-                    if buf[i] != '\"':
-                        cur_str += buf[i]
-                    else:
-                        yield Token(TokenType.STRLIT, cur_str, line)
-                        cur_str = ''
-                        state = START
-                    i += 1
-
-                elif state == KEY_ID:
-                    if buf[i].isalnum() or buf[i] == '_':
-                        cur_str += buf[i]
-                        i += 1
-                    else:
-                        if cur_str in TokenType.Keywords:
-                            yield Token(TokenType.Keywords[cur_str],
-                                        cur_str,
-                                        line)
-                        else:
-                            yield Token(TokenType.ID, cur_str, line)
-                        cur_str = ''
-                        state = START
-
-                elif state == SYMBOL:
-                    matches = [sym for sym in TokenType.Symbols
-                               if sym.startswith(cur_str + buf[i])]
-                    if matches:
-                        cur_str += buf[i]
-                        i += 1
-                    else:
-                        yield Token(TokenType.Symbols[cur_str], cur_str, line)
-                        cur_str = ''
-                        state = START
-
-                elif state == NUMBER:
-                    if buf[i].isdigit():
-                        cur_str += buf[i]
-                        i += 1
-                    else:
-                        yield Token(TokenType.NUM, cur_str, line)
-                        cur_str = ''
-                        state = START
-
-            # Nothing left in the buffer.  Check for any errors
-            # (unclosed strings/comments or unknown Tokens) and return
-            # remaining token, if any.
-            if state == STRLIT:
-                raise ScanException('%s:%d:%d: Unclosed string literal'
-                                    % (self.filename, line, i - line_begin))
-            elif state == COMMENT:
-                raise ScanException('%s:%d:%d: Unclosed comment'
-                                    % (self.filename, line, i - line_begin))
-            elif state == KEY_ID:
-                if cur_str in TokenType.Keywords:
-                    yield Token(TokenType.Keywords[cur_str], cur_str, line)
-                else:
-                    yield Token(TokenType.ID, cur_str, line)
-            elif state == SYMBOL:
-                if cur_str in TokenType.Symbols:
-                    yield Token(TokenType.Symbols[cur_str], cur_str, line)
-                else:
-                    raise ScanException('%s:%d:%d: Unknown Token'
-                                        % (self.filename, line, i - line_begin))
-            elif state == NUMBER:
-                yield Token(TokenType.NUM, cur_str, line)
-            yield Token(TokenType.EOF, 'EOF', line)
+        def location(pos):
+            """Returns the 'file:line:column' prefix for an error at
+            :pos:.  The column is counted from the newline that begins
+            the line.
+
+            """
+            line = buf[:pos].count('\n') + 1
+            line_begin = max(buf.rfind('\n', 0, pos), 0)
+            return '%s:%d:%d' % (self.filename, line, pos - line_begin)
+
+        # Python 3 reads bytes, which the pattern can't match, so decode
+        # them once up front.  latin-1 maps each byte to one character and
+        # can't fail, so non-ASCII bytes scan just as on Python 2, where
+        # bytes are already str: fine in comments and strings, an unknown
+        # character anywhere else.
+        if bytes is not str:
+            buf = buf.decode('latin-1')
+
+        # bind everything the loop uses to locals
+        keywords_get = TokenType.Keywords.get
+        intern_word = _intern
+        symbol_tokens = _SYMBOL_TOKENS
+        ID = TokenType.ID
+        NUM = TokenType.NUM
+        STRLIT = TokenType.STRLIT
+        make_token = Token
+        append = tokens.append
+        SPACE = _SPACE
+        NEWLINES = _NEWLINES
+        IDENT = _IDENT
+        COMMENT = _COMMENT
+        SYMBOL = _SYMBOL
+        NUMBER = _NUMBER
+        STRING = _STRING
+
+        # Newlines can only occur in whitespace and comments, so the
+        # line is advanced there, by the number each one contains, and
+        # is current whenever a token is made.
+        line = 1
+
+        # Branches are ordered by how often each alternative comes up in
+        # typical programs.
+        for m in _TOKEN_RE.finditer(buf):
+            group = m.lastindex
+            if group == SPACE:
+                continue
+            elif group == NEWLINES:
+                line += m.group().count('\n')
+            # keyword or id
+            elif group == IDENT:
+                # interned, so every occurrence of a name shares one
+                # string and later symbol table lookups compare by
+                # identity
+                word = intern_word(m.group())
+                append(make_token(keywords_get(word, ID), word, line))
+            # the value is the Symbols key itself, so each token shares
+            # it rather than holding its own copy of the text
+            elif group == SYMBOL:
+                typ, sym = symbol_tokens[m.group()]
+                append(make_token(typ, sym, line))
+            elif group == NUMBER:
+                append(make_token(NUM, m.group(), line))
+            # string literal, without its quotes
+            elif group == STRING:
+                tok_start = m.start() + 1
+                append(make_token(STRLIT, buf[tok_start:m.end() - 1],
+                                  line))
+            elif group == COMMENT:
+                line += m.group().count('\n')
+            elif group == _UNCLOSED_COMMENT:
+                raise ScanException('%s: Unclosed comment'
+                                    % location(len(buf)))
+            elif group == _UNCLOSED_STRING:
+                end = m.end()
+                if end == len(buf):
+                    raise ScanException('%s: Unclosed string literal'
+                                        % location(end))
+                raise ScanException('%s: Unexpected newline in string literal'
+                                    % location(end))
+            elif group == _UNKNOWN_SYMBOL:
+                raise ScanException('%s: Unknown Token' % location(m.start()))
+            else:
+                raise ScanException('%s: Unknown character %s'
+                                    % (location(m.start()), m.group()))
+
+        append(Token(TokenType.EOF, 'EOF', line))
 
 
 class ScanException(Exception):
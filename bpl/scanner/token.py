@@ -44,43 +44,8 @@ class TokenType():
     EOF = 34
 
     # Converts TokenType values to their variable names. Useful for debugging.
-    constants = {
-        0: 'ID',
-        1: 'NUM',
-        2: 'STRLIT',
-        3: 'INT',
-        4: 'VOID',
-        5: 'STRING',
-        6: 'IF',
-        7: 'ELSE',
-        8: 'WHILE',
-        9: 'RETURN',
-        10: 'WRITE',
-        11: 'WRITELN',
-        12: 'READ',
-        13: 'EQUAL',
-        14: 'SEMI',
-        15: 'COMMA',
-        16: 'LSQUARE',
-        17: 'RSQUARE',
-        18: 'LCURLY',
-        19: 'RCURLY',
-        20: 'LPAREN',
-        21: 'RPAREN',
-        22: 'LESS',
-        23: 'LEQUAL',
-        24: 'BOOLEQ',
-        25: 'NEQUAL',
-        26: 'GEQUAL',
-        27: 'GREATER',
-        28: 'PLUS',
-        29: 'MINUS',
-        30: 'STAR',
-        31: 'SLASH',
-        32: 'MOD',
-        33: 'AMP',
-        34: 'EOF'
-    }
+    # Filled in below from the class variables above.
+    constants = {}
 
     Keywords = {
         'int': INT,
@@ -123,7 +88,20 @@ class TokenType():
     Relops = (LESS, LEQUAL, BOOLEQ, NEQUAL, GEQUAL, GREATER)
 
 
-class Token():
+for name, typ in list(vars(TokenType).items()):
+    if isinstance(typ, int):
+        TokenType.constants[typ] = name
+del name, typ
+
+# TokenType value -> name, indexed by value.  Used by Token.__str__ and
+# by the parser's error messages and declaration types.
+TYPE_NAMES = tuple(TokenType.constants[typ]
+                   for typ in range(len(TokenType.constants)))
+
+
+class Token(object):
+    __slots__ = ('typ', 'val', 'line')
+
     def __init__(self, typ, val, line):
         """Initializes a token of type :typ: representing the string :value:
         occurring on line :line:
@@ -137,7 +115,7 @@ class Token():
 
     def __str__(self):
         return 'Kind: %s, Value: \"%s\", Line: %d' % (
-            TokenType.constants[self.typ],
+            TYPE_NAMES[self.typ],
             self.val,
             self.line
         )
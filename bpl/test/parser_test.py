@@ -7,9 +7,9 @@ if __name__ == '__main__':
             p = Parser(filename)
             p.parse()
             print
-            print(p.tree)
+            print(''.join(str(dec) for dec in p.tree))
     else:
         p = Parser('bpl/test/parse_example.bpl')
         p.parse()
         print
-        print(p.tree)
+        print(''.join(str(dec) for dec in p.tree))
@@ -2,20 +2,24 @@ from bpl.scanner.scanner import Scanner
 from bpl.scanner.token import TokenType
 import sys
 
+
+def print_tokens(filename):
+    """Print every token in :filename:, one per line, in a single write.
+    Tokens scanned before an error are still printed.
+
+    """
+    out = []
+    try:
+        for token in Scanner(filename):
+            if token.typ != TokenType.EOF:
+                out.append('%s\n' % token)
+    finally:
+        sys.stdout.write(''.join(out))
+
+
 if __name__ == '__main__':
     if len(sys.argv) > 1:
         for filename in sys.argv[1:]:
-            s = Scanner(filename)
-
-            # bootstrap by manually asking for the first token
-            s.get_next_token()
-            while s.next_token.typ != TokenType.EOF:
-                print(s.next_token)
-                s.get_next_token()
+            print_tokens(filename)
     else:
-        s = Scanner('bpl/test/scan_example.bpl')
-
-        s.get_next_token()
-        while s.next_token.typ != TokenType.EOF:
-            print(s.next_token)
-            s.get_next_token()
+        print_tokens('bpl/test/scan_example.bpl')
@@ -1,6 +1,28 @@
 from bpl.parser.parser import BPLType, ParseTreeNode as PTN
 from bpl.parser.parsetree import *
-from copy import copy
+
+# Types compared against throughout the checker.  BPLTypes are
+# interned, so these are compared by identity.
+_T_INT = BPLType('INT')
+_T_STR = BPLType('STRING')
+_T_VOID = BPLType('VOID')
+
+# Kinds tested outside the dispatch tables.
+_K_FUN_DEC = PTN.FUN_DEC
+_K_ARR_DEC = PTN.ARR_DEC
+_ADDRESSABLE_KINDS = (PTN.VAR_EXP, PTN.ARR_EXP)
+_ASSIGNABLE_KINDS = (PTN.VAR_EXP, PTN.ARR_EXP, PTN.DEREF_EXP)
+
+
+def handles(*kinds):
+    """Register the decorated TypeChecker method as the handler that
+    check_stmt/check_expr dispatch nodes of the given :kinds: to.
+
+    """
+    def register(method):
+        method.kinds = kinds
+        return method
+    return register
 
 
 class TypeChecker():
@@ -14,121 +36,89 @@ class TypeChecker():
         self.filename = filename
         self.tree = tree
         self.DEBUG = DEBUG
-        # A stack of dicts where the top dict represents symbols
-        # declared in the current scope.
+        # A stack of dicts where the dict at depth - 1 represents
+        # symbols declared in the current scope.  Tables above depth
+        # are empty and kept for reuse by the next push_table.
         self.symbol_tables = []
+        self.depth = 0
+        # Maps each name to the stack of declarations of it that are
+        # in scope, innermost last, so a lookup doesn't have to walk
+        # symbol_tables.
+        self.visible_decs = {}
+        # ids of the top-level declarations, for O(1) global checks.
+        self.global_ids = set()
+        # Pending (handler, node) pairs; see run_work.
+        self.work = []
+        # Declared return type of the function being checked.
+        self.ret_type = None
+        # Handlers indexed by node kind, bound from the methods
+        # registered with @handles; see _register_handlers.
+        self.handlers = [None] * len(PTN.constants)
+        for kind, name in self.handler_names:
+            self.handlers[kind] = getattr(self, name)
 
     def type_check(self):
-        """Type check the AST."""
-        self.link_all_refs()
-        self.check_ast()
-
-    def link_all_refs(self):
-        """Links all symbol references in the parse tree (i.e. variable/array
-        references, function calls) with their declarations.
+        """Type check the AST.  This is a single walk over each function
+        body: symbol references (i.e. variable/array references,
+        function calls) are linked with their declarations on the way
+        down, and expressions are typed on the way back up.  Since
+        BPL requires declaration before use, everything a node refers
+        to is in scope by the time it is visited.
 
         """
         # grab global declarations
-        self.symbol_tables.append({})
-        map(self.add_dec, self.tree)
+        self.push_table()
+        self.global_ids = set(id(dec) for dec in self.tree)
+        add_dec = self.add_dec
+        for dec in self.tree:
+            add_dec(dec)
 
-        # link in all functions
+        # check all functions
         for dec in self.tree:
-            if dec.kind == PTN.FUN_DEC:
-                self.link_function(dec)
+            if dec.kind == _K_FUN_DEC:
+                self.check_func(dec)
 
         # pop the global symbol table
-        self.symbol_tables.pop()
+        self.pop_table()
 
-    def link_function(self, func):
-        """Link symbol references in function bodies."""
-        self.symbol_tables.append({})
-        # grab param declarations
-        if func.params is not None:
-            map(lambda dec: self.add_dec(dec, is_param=True), func.params)
-        # link function body/local decs
-        self.link_comp_stmt(func.body, push_table=False)
-        self.symbol_tables.pop()
-
-    def link_stmt(self, stmt):
-        """Link symbol references in statements."""
-        if stmt.kind == PTN.EXPR_STMT:
-            self.link_expr(stmt.expr)
-        elif stmt.kind == PTN.COMP_STMT:
-            self.link_comp_stmt(stmt)
-        elif stmt.kind == PTN.IF_STMT:
-            self.link_if_stmt(stmt)
-        elif stmt.kind == PTN.WHILE_STMT:
-            self.link_while_stmt(stmt)
-        elif stmt.kind == PTN.RET_STMT:
-            if stmt.val is not None:
-                self.link_expr(stmt.val)
-        elif stmt.kind == PTN.WRITE_STMT:
-            self.link_expr(stmt.expr)
-
-    def link_comp_stmt(self, comp_stmt, push_table=True):
-        """Visit a compound statement, adding its local declarations to our
-        symbol table, and linking its symbol references to their
-        declarations.  If :push_table: is True, push a new symbol
-        table onto the global stack.  :push_table: should only be
-        False when called by link_function, as the local declarations
-        'continue' the same scope as the parameter declarations.
+    def run_work(self):
+        """Run the (handler, node) pairs on self.work until it is empty.
+        The checker walks the tree this way rather than recursing: a
+        handler does whatever it can for its node immediately and
+        pushes the rest (children, then anything that must happen
+        after them) as further work.  Since the stack is LIFO,
+        handlers push in reverse of the order things should run.
 
         """
-        if push_table:
+        work = self.work
+        while work:
+            handler, node = work.pop()
+            handler(node)
+
+    def push_table(self):
+        """Enter a new scope."""
+        if self.depth == len(self.symbol_tables):
             self.symbol_tables.append({})
+        self.depth += 1
 
-        # grab local declarations
-        if comp_stmt.local_decs is not None:
-            map(self.add_dec, comp_stmt.local_decs)
-
-        # link any symbol references to their original declarations
-        if comp_stmt.stmt_list is not None:
-            map(self.link_stmt, comp_stmt.stmt_list)
-        # for stmt in comp_stmt.stmt_list:
-        #     self.link_stmt(stmt)
-
-        if push_table:
-            self.symbol_tables.pop()
+    def pop_table(self, comp_stmt=None):
+        """Leave the current scope (the one opened by :comp_stmt:, when
+        called as a work handler), dropping its declarations from
+        self.visible_decs.
 
-    def link_if_stmt(self, stmt):
-        """Link references in an if statement."""
-        self.link_expr(stmt.cond)
-        self.link_stmt(stmt.true_body)
-        if stmt.false_body is not None:
-            self.link_stmt(stmt.false_body)
-
-    def link_while_stmt(self, stmt):
-        """Link references in a while statement."""
-        self.link_expr(stmt.cond)
-        self.link_stmt(stmt.body)
-
-    def link_expr(self, expr):
-        """Link references in an expression."""
-        if expr.kind == PTN.VAR_EXP:
-            self.link_to_dec(expr)
-            self.print_debug(expr.line_number, self.link_message(expr))
-        elif expr.kind == PTN.ARR_EXP:
-            self.link_to_dec(expr)
-            self.link_expr(expr.index)
-            self.print_debug(expr.line_number, self.link_message(expr))
-        elif expr.kind == PTN.FUN_CALL_EXP:
-            self.link_to_dec(expr, function=True)
-            self.print_debug(expr.line_number, self.link_message(expr))
-            if expr.params is not None:
-                map(self.link_expr, expr.params)
-        elif expr.kind in (PTN.ADDR_EXP,
-                           PTN.DEREF_EXP,
-                           PTN.NEG_EXP):
-            self.link_expr(expr.exp)
-        elif isinstance(expr, OpExpNode):
-            self.link_expr(expr.l_exp)
-            self.link_expr(expr.r_exp)
+        """
+        self.depth -= 1
+        table = self.symbol_tables[self.depth]
+        visible_decs = self.visible_decs
+        for name in table:
+            visible_decs[name].pop()
+        table.clear()
 
     def add_dec(self, dec, is_param=False):
         """Add :dec.name: -> :dec: to the top-level symbol table."""
         # can't re-declare same name
-        if dec.name in self.symbol_tables[-1]:
+        table = self.symbol_tables[self.depth - 1]
+        if dec.name in table:
             raise TypeException(
                 '%s:%d: Attempted to re-declare name "%s".' % (
                     self.filename,
@@ -137,7 +127,7 @@ class TypeChecker():
                 )
             )
         # can't have an array declaration with size < 1 unless its a function parameter
-        if dec.kind == PTN.ARR_DEC and dec.size < 1 and not is_param:
+        if dec.kind == _K_ARR_DEC and not is_param and dec.size < 1:
             raise TypeException(
                 '%s:%d: Array declaration must have size of at least 1.' % (
                     self.filename,
@@ -145,8 +135,9 @@ class TypeChecker():
                 )
             )
         # mark global declarations
-        dec.is_global = True if dec in self.tree else False
-        self.symbol_tables[-1][dec.name] = dec
+        dec.is_global = id(dec) in self.global_ids
+        table[dec.name] = dec
+        self.visible_decs.setdefault(dec.name, []).append(dec)
 
     def get_dec(self, symbol, function=False):
         """Returns the original declaration of :symbol:, or None if not found.
@@ -156,24 +147,21 @@ class TypeChecker():
 
         """
         if function:
-            if symbol in self.symbol_tables[0]:
-                return self.symbol_tables[0][symbol]
-            else:
-                return None
-        else:
-            # Search from top of stack downwards
-            for table in reversed(self.symbol_tables):
-                if symbol in table:
-                    return table[symbol]
-            return None
+            return self.symbol_tables[0].get(symbol)
+        # the innermost declaration in scope
+        decs = self.visible_decs.get(symbol)
+        return decs[-1] if decs else None
 
     def link_to_dec(self, node, function=False):
         """Point :node.dec: to its original declaration.  If :function: is
         True, we want to link to a function declaration in the global
         symbol table.  If no declaration is found in the symbol table,
-        raise a TypeException.
+        raise a TypeException.  Nodes that are already linked are left
+        alone.
 
         """
+        if node.dec is not None:
+            return
         dec = self.get_dec(node.name, function)
         if dec is not None:
             node.dec = dec
@@ -193,223 +181,302 @@ class TypeChecker():
             node.dec.line_number
         )
 
-    def check_ast(self):
-        """Type check the AST"""
-        map(lambda x: self.check_func(x) if x.kind is PTN.FUN_DEC else None,
-            self.tree)
+    def print_link(self, node):
+        """Print the debugging message describing :node:'s link."""
+        self.print_debug(node.line_number, self.link_message(node))
 
     def check_func(self, func):
         """Type check a function declaration :func:."""
         # make sure func.typ is equal to return value
-        ret_type = func.typ
-        self.check_comp_stmt(func.body, ret_type)
-        self.print_debug(
-            func.line_number,
-            'Function declaration [%s] assigned type %s.' % (
-                func.name, func.typ
+        self.ret_type = func.typ
+        self.push_table()
+        # grab param declarations
+        for dec in func.params:
+            self.add_dec(dec, is_param=True)
+        # check function body/local decs
+        self.check_comp_stmt(func.body, push_table=False)
+        self.run_work()
+        self.pop_table()
+        if self.DEBUG:
+            self.print_debug(
+                func.line_number,
+                'Function declaration [%s] assigned type %s.' % (
+                    func.name, func.typ
+                )
             )
-        )
 
-    def check_stmt(self, stmt, ret_type=None):
-        """Type check a generic statement :stmt:.  When :ret_type: is passed,
-        verify that the type of any return statement matches
-        :ret_type:.
+    def check_stmt(self, stmt):
+        """Type check a generic statement :stmt:.  Return statements are
+        checked against self.ret_type, the declared type of the
+        enclosing function.
 
         """
-        if stmt.kind == PTN.EXPR_STMT:
-            self.check_expr(stmt.expr)
-        elif stmt.kind == PTN.COMP_STMT:
-            self.check_comp_stmt(stmt, ret_type)
-        elif stmt.kind == PTN.IF_STMT:
-            self.check_expr(stmt.cond)
-            self.check_stmt(stmt.true_body)
-            if stmt.false_body is not None:
-                self.check_stmt(stmt.false_body)
-        elif stmt.kind == PTN.WHILE_STMT:
-            self.check_expr(stmt.cond)
-            self.check_stmt(stmt.body)
-        elif stmt.kind == PTN.RET_STMT:
-            self.check_ret_stmt(stmt, ret_type)
-        elif stmt.kind == PTN.WRITE_STMT:
-            self.check_expr(stmt.expr)
-            if stmt.expr.typ not in (BPLType('INT'), BPLType('STRING')):
-                raise TypeException('%s:%d: Cannot write type [%s].' %
-                                    (self.filename,
-                                     stmt.line_number,
-                                     stmt.expr.typ))
-
-    def check_comp_stmt(self, stmt, ret_type=None):
-        """Type check a compound statement :stmt:.  When :ret_type: is passed,
-        verify that the type of any return statement matches
-        :ret_type:.
+        handler = self.handlers[stmt.kind]
+        if handler is not None:
+            handler(stmt)
+
+    @handles(PTN.EXPR_STMT)
+    def check_expr_stmt(self, stmt):
+        """Type check an expression statement :stmt:."""
+        self.work.append((self.check_expr, stmt.expr))
+
+    @handles(PTN.IF_STMT)
+    def check_if_stmt(self, stmt):
+        """Type check an if statement :stmt:."""
+        work = self.work
+        if stmt.false_body is not None:
+            work.append((self.check_stmt, stmt.false_body))
+        work.append((self.check_stmt, stmt.true_body))
+        work.append((self.check_expr, stmt.cond))
+
+    @handles(PTN.WHILE_STMT)
+    def check_while_stmt(self, stmt):
+        """Type check a while statement :stmt:."""
+        self.work.append((self.check_stmt, stmt.body))
+        self.work.append((self.check_expr, stmt.cond))
+
+    @handles(PTN.WRITE_STMT)
+    def check_write_stmt(self, stmt):
+        """Type check a write statement :stmt:."""
+        self.work.append((self.finish_write_stmt, stmt))
+        self.work.append((self.check_expr, stmt.expr))
+
+    def finish_write_stmt(self, stmt):
+        """Verify that the checked expression of :stmt: is writable."""
+        if stmt.expr.typ is not _T_INT and stmt.expr.typ is not _T_STR:
+            raise TypeException('%s:%d: Cannot write type [%s].' %
+                                (self.filename,
+                                 stmt.line_number,
+                                 stmt.expr.typ))
+
+    @handles(PTN.COMP_STMT)
+    def check_comp_stmt(self, stmt, push_table=True):
+        """Type check a compound statement :stmt:, adding its local
+        declarations to our symbol table.  If :push_table: is True,
+        push a new symbol table onto the global stack, to be popped
+        once its statements have been checked.  :push_table: should
+        only be False when called by check_func, as the local
+        declarations 'continue' the same scope as the parameter
+        declarations.
 
         """
-        if stmt.stmt_list is not None:
-            map(lambda x: self.check_stmt(x, ret_type), stmt.stmt_list)
+        work = self.work
+        if push_table:
+            self.push_table()
+            work.append((self.pop_table, stmt))
+
+        # grab local declarations
+        add_dec = self.add_dec
+        for dec in stmt.local_decs:
+            add_dec(dec)
+
+        check_stmt = self.check_stmt
+        for child in reversed(stmt.stmt_list):
+            work.append((check_stmt, child))
 
-    def check_ret_stmt(self, stmt, ret_type):
+    @handles(PTN.RET_STMT)
+    def check_ret_stmt(self, stmt):
         """Type check a return statement :stmt:"""
         ret_val = stmt.val
-        if ret_type == BPLType('VOID'):
+        if self.ret_type is _T_VOID:
             if ret_val is not None:
                 raise TypeException('%s:%d: Cannot return value from void function.' %
                                     (self.filename,
                                      stmt.line_number))
         else:
             if ret_val is not None:
-                self.check_expr(stmt.val)
-                self.expect_type_match(
-                    ret_type,
-                    'Returned value does not match declared type',
-                    stmt.val
-                )
+                self.work.append((self.finish_ret_stmt, stmt))
+                self.work.append((self.check_expr, ret_val))
             else:
                 raise TypeException('%s:%d: Missing return value.' %
                                     (self.filename,
                                      stmt.line_number))
 
+    def finish_ret_stmt(self, stmt):
+        """Verify that the checked value of :stmt: has the declared
+        return type.
+
+        """
+        self.expect_type(
+            self.ret_type,
+            'Returned value does not match declared type',
+            stmt.val
+        )
+
     def check_expr(self, expr):
-        """Verify type-correctness of generic expression :expr:"""
-        if expr.kind == PTN.VAR_EXP:
-            self.check_var_expr(expr)
-        elif expr.kind == PTN.ARR_EXP:
-            self.check_arr_expr(expr)
-        elif expr.kind == PTN.ADDR_EXP:
-            self.check_addr_expr(expr)
-        elif expr.kind == PTN.DEREF_EXP:
-            self.check_deref_expr(expr)
-        elif expr.kind == PTN.FUN_CALL_EXP:
-            self.check_funcall_expr(expr)
-        elif expr.kind == PTN.READ_EXP:
-            self.check_read_expr(expr)
-        elif expr.kind == PTN.ASSIGN_EXP:
-            self.check_assign_expr(expr)
-        elif expr.kind == PTN.COMP_EXP:
-            self.check_comp_expr(expr)
-        elif expr.kind == PTN.ARITH_EXP:
-            self.check_arith_expr(expr)
-        elif expr.kind == PTN.NEG_EXP:
-            self.check_neg_expr(expr)
-        elif expr.kind == PTN.INT_EXP:
-            self.check_int_expr(expr)
-        elif expr.kind == PTN.STR_EXP:
-            self.check_str_expr(expr)
+        """Verify type-correctness of generic expression :expr:.  Handlers
+        for expressions with subexpressions push the subexpressions
+        along with a finish_* handler that runs once they are typed.
 
+        """
+        # already typed, e.g. a node shared by several parents
+        if expr.typ is not None:
+            return
+        handler = self.handlers[expr.kind]
+        if handler is not None:
+            handler(expr)
+
+    @handles(PTN.VAR_EXP)
     def check_var_expr(self, expr):
         """Verify type-correctness of var expression :expr:"""
+        self.link_to_dec(expr)
+        if self.DEBUG:
+            self.print_link(expr)
         expr.typ = expr.dec.typ
-        if expr.typ == BPLType('VOID'):
+        if expr.typ is _T_VOID:
             raise TypeException('%s:%d: Cannot declare void variable.' %
                                 (self.filename,
                                  expr.line_number))
-        self.print_debug(
-            expr.line_number,
-            'Variable expression [%s] assigned type %s.' % (
-                expr.name, expr.typ
+        if self.DEBUG:
+            self.print_debug(
+                expr.line_number,
+                'Variable expression [%s] assigned type %s.' % (
+                    expr.name, expr.typ
+                )
             )
-        )
 
+    @handles(PTN.ARR_EXP)
     def check_arr_expr(self, expr):
         """Verify type-correctness of array expression :expr:"""
-        self.check_expr(expr.index)
-        self.expect_type_match(
-            BPLType('INT'),
+        self.link_to_dec(expr)
+        if self.DEBUG:
+            self.print_link(expr)
+        self.work.append((self.finish_arr_expr, expr))
+        self.work.append((self.check_expr, expr.index))
+
+    def finish_arr_expr(self, expr):
+        """Type array expression :expr: once its index is typed."""
+        self.expect_type(
+            _T_INT,
             'Array index expression must evaluate to int',
             expr.index
         )
         expr.typ = expr.dec.typ
-        if expr.typ == BPLType('VOID'):
+        if expr.typ is _T_VOID:
             raise TypeException('%s:%d: Cannot declare void array.' %
                                 (self.filename,
-                                 stmt.line_number))
-        self.print_debug(
-            expr.line_number,
-            'Array expression [%s] assigned type %s.' % (
-                expr.name, expr.typ
+                                 expr.line_number))
+        if self.DEBUG:
+            self.print_debug(
+                expr.line_number,
+                'Array expression [%s] assigned type %s.' % (
+                    expr.name, expr.typ
+                )
             )
-        )
 
+    @handles(PTN.ADDR_EXP)
     def check_addr_expr(self, expr):
         """Verify type-correctness of address expression :expr:"""
-        self.check_expr(expr.exp)
+        self.work.append((self.finish_addr_expr, expr))
+        self.work.append((self.check_expr, expr.exp))
+
+    def finish_addr_expr(self, expr):
+        """Type address expression :expr: once its operand is typed."""
         # can only address variables or array elements
-        if expr.exp.kind in (PTN.VAR_EXP, PTN.ARR_EXP):
-            expr.typ = copy(expr.exp.typ)
-            expr.typ.address()
-            self.print_debug(
-                expr.line_number,
-                'Address expression assigned type %s.' % (expr.typ)
-            )
+        if expr.exp.kind in _ADDRESSABLE_KINDS:
+            expr.typ = expr.exp.typ.addr_of
+            if self.DEBUG:
+                self.print_debug(
+                    expr.line_number,
+                    'Address expression assigned type %s.' % (expr.typ)
+                )
         else:
             raise TypeException('%s:%d: Can\'t address type [%s].' %
                                 (self.filename,
                                  expr.line_number,
                                  expr.exp.typ))
 
+    @handles(PTN.DEREF_EXP)
     def check_deref_expr(self, expr):
         """Verify type-correctness of dereference expression :expr:"""
-        self.check_expr(expr.exp)
+        self.work.append((self.finish_deref_expr, expr))
+        self.work.append((self.check_expr, expr.exp))
+
+    def finish_deref_expr(self, expr):
+        """Type dereference expression :expr: once its operand is typed."""
         if expr.exp.typ.is_pointer():
-            expr.typ = copy(expr.exp.typ)
-            expr.typ.deref()
-            self.print_debug(
-                expr.line_number,
-                'Dereference expression assigned type %s.' % (expr.typ)
-            )
+            expr.typ = expr.exp.typ.deref_of
+            if self.DEBUG:
+                self.print_debug(
+                    expr.line_number,
+                    'Dereference expression assigned type %s.' % (expr.typ)
+                )
         else:
             raise TypeException('%s:%d: Can\'t dereference type [%s].' %
                                 (self.filename,
                                  expr.line_number,
                                  expr.exp.typ))
 
+    @handles(PTN.FUN_CALL_EXP)
     def check_funcall_expr(self, expr):
         """Verify type-correctness of function call expression :expr:"""
+        self.link_to_dec(expr, function=True)
+        if self.DEBUG:
+            self.print_link(expr)
         # verify same number of args and params
         args = expr.params
         params = expr.dec.params
-        args_length = 0
-        params_length = 0
-        if args is not None:
-            for arg in args:
-                args_length += 1
-        if params is not None:
-            for param in params:
-                params_length += 1
-        if params_length != args_length:
+        if len(params) != len(args):
             raise TypeException(
                 '%s:%d: Wrong number of arguments given for function [%s] (%d expected, %d given)' % (
                     self.filename,
                     expr.line_number,
                     expr.name,
-                    params_length,
-                    args_length
+                    len(params),
+                    len(args)
                 )
             )
-        # verify types of args match corresponding types of params
-        if params_length > 0:
-            map(self.check_arg_vs_param, expr.params, expr.dec.params)
+        # verify types of args match corresponding types of params,
+        # checking each argument before the next
+        work = self.work
+        work.append((self.finish_funcall_expr, expr))
+        for arg, param in reversed(list(zip(args, params))):
+            work.append((self.check_arg_vs_param, (arg, param)))
+            work.append((self.check_expr, arg))
+
+    def finish_funcall_expr(self, expr):
+        """Type function call expression :expr: once its arguments are
+        checked.
+
+        """
         expr.typ = expr.dec.typ
-        self.print_debug(
-            expr.line_number,
-            'Function call expression [%s] assigned type %s.' % (
-                expr.name, expr.typ
+        if self.DEBUG:
+            self.print_debug(
+                expr.line_number,
+                'Function call expression [%s] assigned type %s.' % (
+                    expr.name, expr.typ
+                )
             )
-        )
 
+    @handles(PTN.READ_EXP)
     def check_read_expr(self, expr):
         """Verify type-correctness of read expression :expr:"""
-        expr.typ = BPLType('INT')
-        self.print_debug(
-            expr.line_number,
-            'Read expression assigned type %s.' % (expr.typ)
-        )
+        expr.typ = _T_INT
+        if self.DEBUG:
+            self.print_debug(
+                expr.line_number,
+                'Read expression assigned type %s.' % (expr.typ)
+            )
+
+    def check_op_expr(self, expr, finish):
+        """Check both operands of operator expression :expr:, then call
+        :finish: on it.
+
+        """
+        work = self.work
+        work.append((finish, expr))
+        work.append((self.check_expr, expr.r_exp))
+        work.append((self.check_expr, expr.l_exp))
 
+    @handles(PTN.ASSIGN_EXP)
     def check_assign_expr(self, expr):
         """Verify type-correctness of assignment expression :expr:"""
-        self.check_expr(expr.l_exp)
-        self.check_expr(expr.r_exp)
-        if expr.l_exp.kind in (PTN.VAR_EXP, PTN.ARR_EXP, PTN.DEREF_EXP):
-            self.expect_type_match(
+        self.check_op_expr(expr, self.finish_assign_expr)
+
+    def finish_assign_expr(self, expr):
+        """Type assignment expression :expr: once both sides are typed."""
+        if expr.l_exp.kind in _ASSIGNABLE_KINDS:
+            self.expect_types_match(
                 None,
                 'Left/Right hand sides of assignment expression don\'t match',
                 expr.l_exp,
@@ -424,110 +491,148 @@ class TypeChecker():
                     expr.l_exp.kind
                 )
             )
-        self.print_debug(
-            expr.line_number,
-            'Assignment expression assigned type %s.' % (expr.typ)
-        )
+        if self.DEBUG:
+            self.print_debug(
+                expr.line_number,
+                'Assignment expression assigned type %s.' % (expr.typ)
+            )
 
+    @handles(PTN.ARITH_EXP)
     def check_arith_expr(self, expr):
         """Verify type-correctness of assignment expression :expr:"""
-        self.check_expr(expr.l_exp)
-        self.check_expr(expr.r_exp)
-        self.expect_type_match(
-            BPLType('INT'),
+        self.check_op_expr(expr, self.finish_arith_expr)
+
+    def finish_arith_expr(self, expr):
+        """Type arithmetic expression :expr: once its operands are typed."""
+        self.expect_types_match(
+            _T_INT,
             'Arithmetic expression must operate on INT types',
             expr.l_exp,
             expr.r_exp
         )
         expr.typ = expr.l_exp.typ
-        self.print_debug(
-            expr.line_number,
-            'Arithmetic expression assigned type %s.' % (expr.typ)
-        )
+        if self.DEBUG:
+            self.print_debug(
+                expr.line_number,
+                'Arithmetic expression assigned type %s.' % (expr.typ)
+            )
 
+    @handles(PTN.COMP_EXP)
     def check_comp_expr(self, expr):
         """Verify type-correctness of comparison expression :expr:"""
-        self.check_expr(expr.l_exp)
-        self.check_expr(expr.r_exp)
-        self.expect_type_match(
-            BPLType('INT'),
+        self.check_op_expr(expr, self.finish_comp_expr)
+
+    def finish_comp_expr(self, expr):
+        """Type comparison expression :expr: once its operands are typed."""
+        self.expect_types_match(
+            _T_INT,
             'Comparison expression must operate on INT types',
             expr.l_exp,
             expr.r_exp
         )
-        expr.typ = BPLType('INT')
-        self.print_debug(
-            expr.line_number,
-            'Comparison expression assigned type %s.' % (expr.typ)
-        )
+        expr.typ = _T_INT
+        if self.DEBUG:
+            self.print_debug(
+                expr.line_number,
+                'Comparison expression assigned type %s.' % (expr.typ)
+            )
 
+    @handles(PTN.NEG_EXP)
     def check_neg_expr(self, expr):
         """Verify type-correctness of negation expression :expr:"""
-        self.check_expr(expr.exp)
-        self.expect_type_match(
-            BPLType('INT'),
+        self.work.append((self.finish_neg_expr, expr))
+        self.work.append((self.check_expr, expr.exp))
+
+    def finish_neg_expr(self, expr):
+        """Type negation expression :expr: once its operand is typed."""
+        self.expect_type(
+            _T_INT,
             'Negation expression must operate on integer type',
             expr.exp
         )
         expr.typ = expr.exp.typ
-        self.print_debug(
-            expr.line_number,
-            'Negation expression assigned type %s.' % (expr.typ)
-        )
+        if self.DEBUG:
+            self.print_debug(
+                expr.line_number,
+                'Negation expression assigned type %s.' % (expr.typ)
+            )
 
+    @handles(PTN.INT_EXP)
     def check_int_expr(self, expr):
         """Verify type-correctness of integer expression :expr:"""
-        expr.typ = BPLType('INT')
-        self.print_debug(
-            expr.line_number,
-            'Integer expression %s assigned type %s.' % (expr.val, expr.typ)
-        )
+        expr.typ = _T_INT
+        if self.DEBUG:
+            self.print_debug(
+                expr.line_number,
+                'Integer expression %s assigned type %s.' % (expr.val, expr.typ)
+            )
 
+    @handles(PTN.STR_EXP)
     def check_str_expr(self, expr):
         """Verify type-correctness of integer expression :expr:"""
-        expr.typ = BPLType('STRING')
-        self.print_debug(
-            expr.line_number,
-            'String expression assigned type %s.' % (expr.typ)
-        )
+        expr.typ = _T_STR
+        if self.DEBUG:
+            self.print_debug(
+                expr.line_number,
+                'String expression assigned type %s.' % (expr.typ)
+            )
 
-    def check_arg_vs_param(self, arg, param):
-        """Verify that :arg: and :param: have the same type, where :arg: is an
-        argument in a function call, and :param: is the corresponding
-        parameter in the function declaration.
+    def check_arg_vs_param(self, arg_param):
+        """Verify that arg and param in the pair :arg_param: have the same
+        type, where arg is an already-checked argument in a function
+        call, and param is the corresponding parameter in the
+        function declaration.
 
         """
-        self.check_expr(arg)
-        self.expect_type_match(
-            None,
-            'Function argument doesn\'t match declared type %s' % (
-                param.typ
-            ),
-            arg,
-            param
-        )
+        arg, param = arg_param
+        # the message names the parameter's type, so it is only
+        # formatted once we know there is a mismatch
+        if param.typ is not arg.typ:
+            self.type_mismatch(
+                arg.typ,
+                'Function argument doesn\'t match declared type %s' % (
+                    param.typ
+                ),
+                param
+            )
+
+    def expect_type(self, expected_type, message, tree_node):
+        """Verify that ParseTreeNode :tree_node: has type :expected_type:.
+        If it doesn't, raise a TypeException containing message
+        :message:.
+
+        """
+        if tree_node.typ is not expected_type:
+            self.type_mismatch(expected_type, message, tree_node)
 
-    def expect_type_match(self, expected_type, message, *tree_nodes):
-        """Verify that all ParseTreeNodes in :tree_nodes: have the same type
-        as each other, comparing their types to :expected_type: if
-        given.  If types don't match, raise a TypeException containing
-        message :message:.
+    def expect_types_match(self, expected_type, message, node_a, node_b):
+        """Verify that ParseTreeNodes :node_a: and :node_b: have the same
+        type, comparing their types to :expected_type: if given, or to
+        each other if not.  If types don't match, raise a
+        TypeException containing message :message:.
 
         """
         if expected_type is None:
-            expected_type = tree_nodes[0].typ
-
-        for tree_node in tree_nodes:
-            if tree_node.typ != expected_type:
-                raise TypeException(
-                    '%s:%d: Mismatched types; expected %s, but got %s\n%s' % (
-                        self.filename,
-                        tree_node.line_number,
-                        expected_type,
-                        tree_node.typ,
-                        message
-                    )
-                )
+            expected_type = node_a.typ
+        elif node_a.typ is not expected_type:
+            self.type_mismatch(expected_type, message, node_a)
+        if node_b.typ is not expected_type:
+            self.type_mismatch(expected_type, message, node_b)
+
+    def type_mismatch(self, expected_type, message, tree_node):
+        """Raise the TypeException for :tree_node: not having type
+        :expected_type:.
+
+        """
+        raise TypeException(
+            '%s:%d: Mismatched types; expected %s, but got %s\n%s' % (
+                self.filename,
+                tree_node.line_number,
+                expected_type,
+                tree_node.typ,
+                message
+            )
+        )
 
     def print_debug(self, line_number, message):
         """Print :message: if self.DEBUG is True."""
@@ -535,6 +640,21 @@ class TypeChecker():
             print('%s:%d: %s' % (self.filename, line_number, message))
 
 
+def _register_handlers(cls):
+    """Collect the (kind, method name) pairs registered with @handles on
+    :cls: into cls.handler_names.
+
+    """
+    cls.handler_names = [
+        (kind, name)
+        for name, method in vars(cls).items()
+        for kind in getattr(method, 'kinds', ())
+    ]
+
+
+_register_handlers(TypeChecker)
+
+
 class TypeException(Exception):
     def __init__(self, message):
         Exception.__init__(self, message)